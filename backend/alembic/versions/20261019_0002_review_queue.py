@@ -0,0 +1,34 @@
+"""spaced-repetition review queue
+
+Revision ID: 20261019_0002
+Revises: 20250812_0001
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261019_0002"
+down_revision = "20250812_0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "review_queue",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("content_item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("ease", sa.Float(), nullable=False),
+        sa.Column("repetitions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("lapses", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("interval_days", sa.Float(), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_reviewed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    # Serves "due reviews for a user" as a single index range scan
+    op.create_index("ix_review_queue_user_due", "review_queue", ["user_id", "due_at"])
+
+def downgrade():
+    op.drop_index("ix_review_queue_user_due", table_name="review_queue")
+    op.drop_table("review_queue")
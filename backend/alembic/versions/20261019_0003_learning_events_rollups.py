@@ -0,0 +1,71 @@
+"""learning events, content/skill mapping and rollup summary tables
+
+Revision ID: 20261019_0003
+Revises: 20261019_0002
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261019_0003"
+down_revision = "20261019_0002"
+branch_labels = None
+depends_on = None
+
+def _stats_columns():
+    return [
+        sa.Column("starts", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("completions", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("timed_completions", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("total_seconds", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    ]
+
+def upgrade():
+    # content_item_skills
+    op.create_table(
+        "content_item_skills",
+        sa.Column("content_item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("skill_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+    )
+    op.create_index("ix_content_item_skills_skill_id", "content_item_skills", ["skill_id"])
+
+    # learning_events (append-only)
+    op.create_table(
+        "learning_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("content_item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("content_items.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("event_type", sa.String(length=16), nullable=False),   # start/complete
+        sa.Column("duration_seconds", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_learning_events_user_id", "learning_events", ["user_id"])
+
+    # rollup summary tables
+    op.create_table(
+        "content_item_stats",
+        sa.Column("content_item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True),
+        *_stats_columns(),
+    )
+    op.create_table(
+        "skill_stats",
+        sa.Column("skill_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+        *_stats_columns(),
+    )
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("last_event_id", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("rollup_watermarks")
+    op.drop_table("skill_stats")
+    op.drop_table("content_item_stats")
+    op.drop_index("ix_learning_events_user_id", table_name="learning_events")
+    op.drop_table("learning_events")
+    op.drop_index("ix_content_item_skills_skill_id", table_name="content_item_skills")
+    op.drop_table("content_item_skills")
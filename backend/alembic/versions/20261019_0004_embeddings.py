@@ -0,0 +1,25 @@
+"""embedding columns on content_items and skills
+
+Revision ID: 20261019_0004
+Revises: 20261019_0003
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_0004"
+down_revision = "20261019_0003"
+branch_labels = None
+depends_on = None
+
+EMBEDDING_DIM = 128
+
+def upgrade():
+    for table in ("content_items", "skills"):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN embedding vector({EMBEDDING_DIM})")
+        op.add_column(table, sa.Column("embedding_hash", sa.String(length=64), nullable=True))
+
+def downgrade():
+    for table in ("skills", "content_items"):
+        op.drop_column(table, "embedding_hash")
+        op.drop_column(table, "embedding")
@@ -0,0 +1,41 @@
+"""IRT item calibrations, learner abilities and attempt correctness
+
+Revision ID: 20261019_0005
+Revises: 20261019_0004
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20261019_0005"
+down_revision = "20261019_0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("learning_events", sa.Column("correct", sa.Boolean(), nullable=True))
+
+    op.create_table(
+        "item_calibrations",
+        sa.Column("content_item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("discrimination", sa.Float(), nullable=False, server_default="1.0"),
+        sa.Column("difficulty", sa.Float(), nullable=False, server_default="0.0"),
+        sa.Column("n_responses", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("calibrated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+    op.create_table(
+        "learner_abilities",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("skill_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("theta", sa.Float(), nullable=False, server_default="0.0"),
+        sa.Column("precision", sa.Float(), nullable=False, server_default="1.0"),
+        sa.Column("n_responses", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("learner_abilities")
+    op.drop_table("item_calibrations")
+    op.drop_column("learning_events", "correct")
@@ -0,0 +1,20 @@
+"""job heartbeats
+
+Revision ID: 20261019_0008
+Revises: 20261019_0007
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_0008"
+down_revision = "20261019_0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Refreshed by the worker while a job runs; stale detection keys off it
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+def downgrade():
+    op.drop_column("jobs", "heartbeat_at")
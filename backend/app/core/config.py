@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import AnyUrl
-from typing import List
+from typing import List, Optional, Set
 
 class Settings(BaseSettings):
     DATABASE_URL: AnyUrl
@@ -8,13 +8,76 @@ class Settings(BaseSettings):
     JWT_ALGO: str = "HS256"
     ACCESS_TOKEN_MINUTES: int = 15
     REFRESH_TOKEN_DAYS: int = 7
+    # Argon2 cost (read by app.core.security); defaults match passlib's, so
+    # hashes made before these were configurable stay current
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
     CORS_ORIGINS: str = "http://localhost:5175"
     ENV: str = "dev"
+    ADMIN_EMAILS: str = ""
+
+    # Spaced-repetition scheduler (see app.services.reviews)
+    REVIEW_INITIAL_EASE: float = 2.5
+    REVIEW_MIN_EASE: float = 1.3
+    REVIEW_FIRST_INTERVAL_DAYS: float = 1.0
+    REVIEW_SECOND_INTERVAL_DAYS: float = 6.0
+    REVIEW_INTERVAL_MODIFIER: float = 1.0
+    REVIEW_MAX_INTERVAL_DAYS: float = 365.0
+    REVIEW_CACHE_USERS: int = 1024
+    REVIEW_CACHE_TTL_SECONDS: float = 30.0
+
+    # Content popularity rollups (see app.services.rollups)
+    ROLLUP_BATCH_SIZE: int = 50_000
+    ROLLUP_SETTLE_SECONDS: float = 5.0
+    STATS_CACHE_TTL_SECONDS: float = 60.0
+
+    # Offline embeddings (see app.tools.embed_content)
+    EMBEDDING_MODEL_PATH: str = "data/embedding_model.npz"
+
+    # Adaptive challenges (see app.services.irt)
+    IRT_ITEM_BANK_TTL_SECONDS: float = 300.0
+    IRT_RECENT_EXCLUDE: int = 50
+
+    # Background jobs (see app.worker)
+    WORKER_CONCURRENCY: int = 4
+    WORKER_POOL: str = "thread"  # thread/process
+    WORKER_BATCH_SIZE: int = 8
+    WORKER_POLL_SECONDS: float = 5.0
+    JOB_HEARTBEAT_SECONDS: float = 30.0
+    JOB_STALE_SECONDS: float = 120.0  # no heartbeat for this long -> worker presumed dead
+    JOB_RETENTION_SECONDS: float = 7 * 24 * 3600.0
+
+    # Idempotency-Key support (see app.core.idempotency)
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 3600.0
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Real-time push (see app.routers.realtime); limits are per API worker
+    REALTIME_MAX_CONNECTIONS: int = 50_000
+    REALTIME_MAX_PER_USER: int = 8
+    REALTIME_QUEUE_SIZE: int = 64  # distinct undelivered topics per connection
+    REALTIME_HEARTBEAT_SECONDS: float = 25.0
+    REALTIME_IDLE_SECONDS: float = 90.0
+    # Lifetime of the single-purpose ticket browsers put in the /ws and /sse URL
+    REALTIME_TICKET_SECONDS: int = 30
+
+    # psycopg prepares a statement server-side once a connection has run it this
+    # many times; -1 disables (required behind PgBouncer in transaction mode)
+    DB_PREPARE_THRESHOLD: int = 5
+
+    @property
+    def prepare_threshold(self) -> Optional[int]:
+        return self.DB_PREPARE_THRESHOLD if self.DB_PREPARE_THRESHOLD >= 0 else None
 
     @property
     def cors_list(self) -> List[str]:
         return [o.strip() for o in self.CORS_ORIGINS.split(",") if o.strip()]
 
+    @property
+    def admin_emails(self) -> Set[str]:
+        return {e.strip().lower() for e in self.ADMIN_EMAILS.split(",") if e.strip()}
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 settings = Settings()
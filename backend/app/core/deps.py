@@ -4,10 +4,12 @@ import os
 from typing import Generator, Optional
 
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.config import settings
 from app.core.security import decode_token
+from app.db import queries
 # Adjust these imports to match your project's models location if needed
 from app.models import User  # expects a SQLAlchemy 2.x declarative model with fields: id, email, hashed_password
 
@@ -21,6 +23,7 @@ engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     future=True,
+    connect_args={"prepare_threshold": settings.prepare_threshold},
 )
 SessionLocal = sessionmaker(
     bind=engine,
@@ -88,7 +91,8 @@ def get_current_user(
         )
 
     user_id = str(payload.get("sub", "")).strip()
-    if not user_id:
+    # Other token types (e.g. realtime tickets) are not access tokens
+    if not user_id or payload.get("type", "access") != "access":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -96,8 +100,7 @@ def get_current_user(
         )
 
     # Load user
-    stmt = select(User).where(User.id == user_id)
-    user = db.execute(stmt).scalar_one_or_none()
+    user = db.execute(queries.USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -106,3 +109,15 @@ def get_current_user(
         )
 
     return user
+
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Current user, restricted to the addresses listed in ADMIN_EMAILS.
+    """
+    if current_user.email.lower() not in settings.admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
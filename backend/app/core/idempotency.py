@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.security import decode_token
+from app.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+MAX_STORED_BODY = 1024 * 1024  # larger responses are passed through uncached
+LEASE_FACTOR = 3  # in-progress lease = wait_seconds * LEASE_FACTOR
+
+CacheKey = Tuple[str, str]  # (scope, key)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    media_type: Optional[str]
+    body: bytes
+
+
+@dataclass(frozen=True)
+class ClaimResult:
+    state: str  # "owner" | "done" | "busy" | "missing"
+    stored: Optional[StoredResponse] = None
+
+
+# --- Local LRU ---
+class ResponseCache:
+    """Small thread-safe LRU of completed responses with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[CacheKey, Tuple[float, StoredResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[StoredResponse]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            expires, stored = hit
+            if time.monotonic() > expires:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return stored
+
+    def put(self, key: CacheKey, stored: StoredResponse, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, stored)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+# --- Shared store (Postgres) ---
+class PostgresIdempotencyStore:
+    """
+    Cross-worker record of keys. A row is inserted as in_progress by the
+    first request to use a key (the primary key makes that race-free) and
+    filled in with the response once it completes.
+
+    In-progress rows only hold a short lease, so a key whose worker died
+    before completing becomes claimable again; the full TTL starts when the
+    response is stored.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], ttl_seconds: float, lease_seconds: float):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+
+    def claim(self, scope: str, key: str, request_hash: str) -> ClaimResult:
+        expires = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+        fresh = {
+            "request_hash": request_hash,
+            "status": "in_progress",
+            "response_status": None,
+            "response_media_type": None,
+            "response_body": None,
+            "created_at": func.now(),
+            "expires_at": expires,
+        }
+        with self.session_factory() as db:
+            # Insert, or take over a row (or lapsed lease) that expired but hasn't been purged yet
+            inserted = db.execute(
+                insert(IdempotencyKey)
+                .values(scope=scope, key=key, request_hash=request_hash, status="in_progress", expires_at=expires)
+                .on_conflict_do_update(
+                    index_elements=["scope", "key"],
+                    set_=fresh,
+                    where=IdempotencyKey.expires_at <= func.now(),
+                )
+                .returning(IdempotencyKey.key)
+            ).first()
+            db.commit()
+        if inserted:
+            return ClaimResult("owner")
+        return self.fetch(scope, key)
+
+    def fetch(self, scope: str, key: str) -> ClaimResult:
+        with self.session_factory() as db:
+            row = db.execute(
+                select(IdempotencyKey).where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.expires_at > datetime.now(timezone.utc),
+                )
+            ).scalar_one_or_none()
+        if row is None:
+            return ClaimResult("missing")
+        if row.status != "done":
+            return ClaimResult("busy", StoredResponse(row.request_hash, 0, None, b""))
+        return ClaimResult(
+            "done",
+            StoredResponse(row.request_hash, row.response_status, row.response_media_type, row.response_body or b""),
+        )
+
+    def complete(self, scope: str, key: str, stored: StoredResponse, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self.session_factory() as db:
+            db.execute(
+                text("""
+                    UPDATE idempotency_keys
+                    SET status = 'done', response_status = :s, response_media_type = :m, response_body = :b,
+                        expires_at = now() + make_interval(secs => :ttl)
+                    WHERE scope = :scope AND key = :key AND status = 'in_progress'
+                """),
+                {"s": stored.status_code, "m": stored.media_type, "b": stored.body, "ttl": ttl,
+                 "scope": scope, "key": key},
+            )
+            db.commit()
+
+    def release(self, scope: str, key: str) -> None:
+        """Forget an in-progress key so a retry can execute again."""
+        with self.session_factory() as db:
+            db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status == "in_progress",
+                )
+            )
+            db.commit()
+
+
+def purge_expired(db: Session) -> int:
+    """Delete expired keys; run periodically by app.worker."""
+    n = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())).rowcount
+    db.commit()
+    return n
+
+
+# --- Middleware ---
+def _scope_for(request: Request) -> str:
+    """Keys are namespaced per authenticated user; unauthenticated calls share 'anon'."""
+    auth = request.headers.get("authorization", "")
+    parts = auth.split()
+    if len(parts) == 2 and parts[0].lower() == "bearer":
+        try:
+            return str(decode_token(parts[1])["sub"])[:64]
+        except Exception:
+            pass
+    return "anon"
+
+
+def _error(code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=code, content={"detail": detail})
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Idempotency-Key support for POST routes.
+
+    The first request for a (user, key) runs normally and its response (< 500)
+    is stored; retries with the same body get the stored response back, with
+    a different body get 422. Concurrent duplicates in this process await the
+    first request's result; duplicates on other workers poll the shared store.
+
+    `skip_paths` are never stored (e.g. login, which is safe to repeat and
+    whose token shouldn't sit in the store); `ttl_caps` shortens how long a
+    path's responses are kept (e.g. signup, so a replayed token is still valid).
+    """
+
+    def __init__(
+        self,
+        app,
+        store: PostgresIdempotencyStore,
+        cache_size: int = 10_000,
+        ttl_seconds: float = 24 * 3600.0,
+        wait_seconds: float = 10.0,
+        skip_paths: Iterable[str] = (),
+        ttl_caps: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__(app)
+        self.store = store
+        self.cache = ResponseCache(cache_size, ttl_seconds)
+        self.wait_seconds = wait_seconds
+        self.skip_paths = frozenset(skip_paths)
+        self.ttl_caps = dict(ttl_caps or {})
+        self._inflight: Dict[CacheKey, "asyncio.Future[Optional[StoredResponse]]"] = {}
+
+    @staticmethod
+    def _replay(stored: StoredResponse, request_hash: str) -> Response:
+        if stored.request_hash != request_hash:
+            return _error(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                "Idempotency-Key was already used with a different request",
+            )
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type=stored.media_type,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    async def _wait_remote(self, scope: str, key: str) -> ClaimResult:
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.05
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            result = await run_in_threadpool(self.store.fetch, scope, key)
+            if result.state != "busy":
+                return result
+            delay = min(delay * 2, 0.5)
+        return ClaimResult("busy")
+
+    async def dispatch(self, request: Request, call_next):
+        key = request.headers.get(HEADER)
+        if request.method != "POST" or not key or request.url.path in self.skip_paths:
+            return await call_next(request)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(status.HTTP_400_BAD_REQUEST, f"{HEADER} must be at most {MAX_KEY_LENGTH} characters")
+
+        body = await request.body()
+        request_hash = hashlib.sha256(f"{request.method} {request.url.path}\n".encode() + body).hexdigest()
+        scope = _scope_for(request)
+        ck: CacheKey = (scope, key)
+
+        stored = self.cache.get(ck)
+        if stored is not None:
+            return self._replay(stored, request_hash)
+
+        leader = self._inflight.get(ck)
+        if leader is not None:
+            stored = await asyncio.shield(leader)
+            if stored is not None:
+                return self._replay(stored, request_hash)
+            return _error(status.HTTP_409_CONFLICT, "A request with this Idempotency-Key failed; retry")
+
+        fut: "asyncio.Future[Optional[StoredResponse]]" = asyncio.get_running_loop().create_future()
+        self._inflight[ck] = fut
+        stored = None
+        try:
+            result = await run_in_threadpool(self.store.claim, scope, key, request_hash)
+            if result.state == "busy":
+                result = await self._wait_remote(scope, key)
+            if result.state == "done":
+                stored = result.stored
+                self.cache.put(ck, stored)
+                return self._replay(stored, request_hash)
+            if result.state != "owner":
+                return _error(status.HTTP_409_CONFLICT, "A request with this Idempotency-Key is still in progress")
+
+            try:
+                response = await call_next(request)
+                content = b"".join([chunk async for chunk in response.body_iterator])
+            except BaseException:
+                await run_in_threadpool(self.store.release, scope, key)
+                raise
+
+            if response.status_code < 500 and len(content) <= MAX_STORED_BODY:
+                stored = StoredResponse(request_hash, response.status_code, response.headers.get("content-type"), content)
+                ttl = self.ttl_caps.get(request.url.path)
+                await run_in_threadpool(self.store.complete, scope, key, stored, ttl)
+                self.cache.put(ck, stored, ttl)
+            else:
+                await run_in_threadpool(self.store.release, scope, key)
+            return Response(
+                content=content,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+            )
+        finally:
+            if not fut.done():
+                fut.set_result(stored)
+            self._inflight.pop(ck, None)
@@ -7,36 +7,72 @@ from typing import Any, Dict, Optional
 import jwt  # PyJWT
 from passlib.hash import argon2
 
+from app.core.config import settings
+
 
 # --- Environment / Defaults ---
 JWT_SECRET: str = os.getenv("JWT_SECRET", "dev_super_secret_change_me")
 JWT_ALGO: str = os.getenv("JWT_ALGO", "HS256")
 DEFAULT_ACCESS_MINUTES: int = int(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
 
+# Argon2 cost, from Settings; pick values with `python -m app.tools.calibrate_argon2`.
+ARGON2_TIME_COST: int = settings.ARGON2_TIME_COST
+ARGON2_MEMORY_COST: int = settings.ARGON2_MEMORY_COST  # KiB
+ARGON2_PARALLELISM: int = settings.ARGON2_PARALLELISM
+
+
+def argon2_hasher(time_cost: int, memory_cost: int, parallelism: int):
+    """
+    passlib Argon2 handler pinned to exactly these parameters: hashes made with
+    any other time/memory/parallelism report needs_update() == True.
+    """
+    return argon2.using(
+        rounds=time_cost,
+        min_desired_rounds=time_cost,
+        max_desired_rounds=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+    )
+
+
+_hasher = argon2_hasher(ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM)
+
 
 # --- Password hashing (Argon2 via passlib) ---
 def hash_password(plain_password: str) -> str:
     """
     Hash a plaintext password using Argon2.
 
-    Argon2 parameters are controlled by passlib defaults or env vars if configured
-    inside the image. The returned string includes the salt and parameters.
+    Parameters come from ARGON2_TIME_COST / ARGON2_MEMORY_COST /
+    ARGON2_PARALLELISM. The returned string includes the salt and parameters.
     """
-    return argon2.hash(plain_password)
+    return _hasher.hash(plain_password)
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
     """
     Constant-time verification of a plaintext password against an Argon2 hash.
+    Hashes made with older parameters still verify.
     Returns True on success, False otherwise.
     """
     try:
-        return argon2.verify(plain_password, password_hash)
+        return _hasher.verify(plain_password, password_hash)
     except Exception:
         # Covers malformed hashes or internal errors; never leak details.
         return False
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """
+    True if the hash was made with different Argon2 parameters than the
+    current configuration (call only after a successful verify).
+    """
+    try:
+        return _hasher.needs_update(password_hash)
+    except Exception:
+        return False
+
+
 # --- JWT helpers ---
 def create_access_token(
     sub: str,
@@ -66,6 +102,29 @@ def create_access_token(
     return token
 
 
+REALTIME_TICKET_TYPE = "realtime"
+
+
+def create_realtime_ticket(sub: str, expires_seconds: int, session_expires_at: Optional[float] = None) -> str:
+    """
+    Short-lived JWT that only opens a realtime connection (/ws, /sse).
+    Browsers must pass it in the URL, where it can land in access logs, so it
+    expires within seconds and is not accepted as an access token.
+    `session_expires_at` (the access token's exp) is carried along so the
+    connection still ends when the session would have.
+    """
+    now = datetime.now(timezone.utc)
+    payload: Dict[str, Any] = {
+        "sub": sub,
+        "iat": int(now.timestamp()),
+        "exp": int((now + timedelta(seconds=expires_seconds)).timestamp()),
+        "type": REALTIME_TICKET_TYPE,
+    }
+    if session_expires_at is not None:
+        payload["session_exp"] = int(session_expires_at)
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGO)
+
+
 def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode & validate a JWT. Returns the payload dict on success.
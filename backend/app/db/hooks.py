@@ -0,0 +1,35 @@
+"""
+In-process side effects that must only happen once a transaction commits
+(e.g. updating a process-wide cache with what the request just wrote).
+"""
+from __future__ import annotations
+
+import logging
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+log = logging.getLogger("app.db")
+
+_KEY = "after_commit"
+
+
+def after_commit(db: Session, fn: Callable[[], None]) -> None:
+    """Call `fn` once `db`'s current transaction commits; dropped if it rolls back."""
+    db.info.setdefault(_KEY, []).append(fn)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for fn in session.info.pop(_KEY, ()):
+        try:
+            fn()
+        except Exception:
+            # The data is committed; a failed side effect must not turn that into an error
+            log.exception("after-commit hook failed")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session: Session) -> None:
+    session.info.pop(_KEY, None)
@@ -0,0 +1,32 @@
+"""
+Statements on the per-request hot path.
+
+Each is built once at import with named bind parameters, so a request only
+supplies values: SQLAlchemy memoizes the cache key on the statement object
+and finds the compiled SQL without rebuilding or re-hashing a select. The
+email lookups use plain table columns, which keeps them off the ORM
+compile/loading path entirely. The SQL text never varies, which is also what
+lets psycopg reuse a server-side prepared statement (DB_PREPARE_THRESHOLD).
+
+Measured with app.tools.bench_queries. Lambda statements (lambda_stmt) were
+tried and cost more than they saved for lookups this small.
+"""
+from __future__ import annotations
+
+from sqlalchemy import bindparam, select
+
+from app.models import User
+
+_users = User.__table__
+
+# ORM User by primary key; get_current_user, on every authenticated request.
+# Params: user_id
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+# Row (id,) for a normalized email; signup's duplicate check. Params: email
+USER_ID_BY_EMAIL = select(_users.c.id).where(_users.c.email == bindparam("email"))
+
+# Row (id, password_hash) for a normalized email; all login needs. Params: email
+CREDENTIALS_BY_EMAIL = (
+    select(_users.c.id, _users.c.password_hash).where(_users.c.email == bindparam("email"))
+)
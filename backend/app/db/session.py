@@ -2,5 +2,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(
+    str(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    connect_args={"prepare_threshold": settings.prepare_threshold},
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import cast
+from sqlalchemy.types import UserDefinedType
+
+# Width of content/skill embeddings; must match the vector(N) columns
+EMBEDDING_DIM = 128
+
+
+class Vector(UserDefinedType):
+    """
+    pgvector column. Values travel as pgvector's text form ("[1,2,3]") so no
+    extra driver adapter is needed.
+    """
+    cache_ok = True
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+
+    def get_col_spec(self, **kw: Any) -> str:
+        return "vector" if self.dim is None else f"vector({self.dim})"
+
+    def bind_expression(self, bindvalue):
+        return cast(bindvalue, self)
+
+    def bind_processor(self, dialect):
+        def process(value: Optional[Sequence[float]]) -> Optional[str]:
+            return None if value is None else to_pg_vector(value)
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value: Any) -> Optional[List[float]]:
+            if value is None or isinstance(value, list):
+                return value
+            body = str(value).strip("[]")
+            return [float(x) for x in body.split(",")] if body else []
+        return process
+
+
+def to_pg_vector(values: Sequence[float]) -> str:
+    return "[" + ",".join(format(float(v), ".7g") for v in values) + "]"
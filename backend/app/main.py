@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import auth, users
+from app.core.config import settings
+from app.core.deps import SessionLocal
+from app.core.idempotency import LEASE_FACTOR, IdempotencyMiddleware, PostgresIdempotencyStore
+from app.routers import admin_export, admin_jobs, auth, challenges, content, events, realtime, reviews, users
 
 # If your project already exposes a settings object with cors_list, import it.
 # It should include http://localhost:5176 (you mentioned it's already updated).
@@ -14,7 +19,39 @@ except Exception:
     # Fallback to allow 5176 explicitly if settings aren't available
     CORS_LIST = ["http://localhost:5176"]
 
-app = FastAPI(title="API", version="1.0.0")
+
+# Review schedules committed on any worker also update this worker's due cache
+for _topic in ("reviews", "resync"):
+    realtime.hub.add_listener(_topic, reviews.on_realtime)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Real-time fan-out: one LISTEN connection per worker (same URL conversion as app.wait_for_db)
+    realtime.hub.start(str(settings.DATABASE_URL).replace("postgresql+psycopg://", "postgresql://"))
+    try:
+        yield
+    finally:
+        await realtime.hub.stop()
+
+
+app = FastAPI(title="API", version="1.0.0", lifespan=lifespan)
+
+# Idempotency-Key support for POST routes (stored responses shared across workers).
+# Added before CORS so CORS stays outermost and replays get CORS headers too.
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=PostgresIdempotencyStore(
+        SessionLocal,
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        lease_seconds=settings.IDEMPOTENCY_WAIT_SECONDS * LEASE_FACTOR,
+    ),
+    cache_size=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    skip_paths=("/auth/login",),
+    ttl_caps={"/auth/signup": settings.ACCESS_TOKEN_MINUTES * 60},
+)
 
 # CORS: allow the new frontend dev server on 5176 (and anything in settings)
 app.add_middleware(
@@ -28,6 +65,13 @@ app.add_middleware(
 # Routers
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(reviews.router)
+app.include_router(events.router)
+app.include_router(content.router)
+app.include_router(challenges.router)
+app.include_router(admin_export.router)
+app.include_router(admin_jobs.router)
+app.include_router(realtime.router)
 
 
 @app.get("/", tags=["health"])
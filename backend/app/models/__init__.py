@@ -1,4 +1,10 @@
 from .user import User
 from .profile import Profile
-from .skill import Skill
+from .skill import Skill, ContentSkill
 from .content import ContentItem
+from .review import ReviewItem
+from .event import LearningEvent
+from .stats import ContentItemStats, SkillStats, RollupWatermark
+from .irt import ItemCalibration, LearnerAbility
+from .job import Job
+from .idempotency import IdempotencyKey
@@ -7,6 +7,7 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.db.types import EMBEDDING_DIM, Vector
 
 class ContentItem(Base):
     __tablename__ = "content_items"
@@ -24,3 +25,8 @@ class ContentItem(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # Written by app.tools.embed_content; deferred so normal loads skip it
+    embedding: Mapped[Optional[list[float]]] = mapped_column(
+        Vector(EMBEDDING_DIM), default=None, deferred=True
+    )
+    embedding_hash: Mapped[Optional[str]] = mapped_column(String(64), default=None)
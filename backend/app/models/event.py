@@ -0,0 +1,27 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+import uuid
+from sqlalchemy import BigInteger, Boolean, Identity, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+class LearningEvent(Base):
+    __tablename__ = "learning_events"
+
+    # Monotonic id doubles as the rollup watermark
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    content_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("content_items.id", ondelete="CASCADE"), nullable=False
+    )
+    event_type: Mapped[str] = mapped_column(String(16), nullable=False)  # start/complete/attempt
+    duration_seconds: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    correct: Mapped[Optional[bool]] = mapped_column(Boolean, default=None)  # attempts only
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Integer, LargeBinary, String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)  # user id or "anon"
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), default="in_progress", nullable=False)  # in_progress/done
+    response_status: Mapped[Optional[int]] = mapped_column(Integer, default=None)
+    response_media_type: Mapped[Optional[str]] = mapped_column(String(128), default=None)
+    response_body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
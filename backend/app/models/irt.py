@@ -0,0 +1,40 @@
+from __future__ import annotations
+from datetime import datetime
+import uuid
+from sqlalchemy import Float, Integer, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+class ItemCalibration(Base):
+    """IRT parameters for a challenge, fitted offline by app.tools.calibrate_irt."""
+    __tablename__ = "item_calibrations"
+
+    content_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    discrimination: Mapped[float] = mapped_column(Float, default=1.0, nullable=False)  # a
+    difficulty: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)      # b
+    n_responses: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    calibrated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class LearnerAbility(Base):
+    """Per-skill ability estimate, updated after every answer."""
+    __tablename__ = "learner_abilities"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    skill_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True
+    )
+    theta: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    precision: Mapped[float] = mapped_column(Float, default=1.0, nullable=False)  # 1 / posterior variance
+    n_responses: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -1,11 +1,12 @@
 from __future__ import annotations
 from datetime import datetime
 import uuid
-from sqlalchemy import String, Text, DateTime, func
+from sqlalchemy import String, Text, DateTime, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.db.types import EMBEDDING_DIM, Vector
 
 class Skill(Base):
     __tablename__ = "skills"
@@ -20,3 +21,20 @@ class Skill(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # Written by app.tools.embed_content; deferred so normal loads skip it
+    embedding: Mapped[list[float] | None] = mapped_column(
+        Vector(EMBEDDING_DIM), default=None, deferred=True
+    )
+    embedding_hash: Mapped[str | None] = mapped_column(String(64), default=None)
+
+
+class ContentSkill(Base):
+    """Which skills a content item teaches (many-to-many)."""
+    __tablename__ = "content_item_skills"
+
+    content_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    skill_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
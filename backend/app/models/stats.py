@@ -0,0 +1,47 @@
+from __future__ import annotations
+from datetime import datetime
+import uuid
+from sqlalchemy import BigInteger, String, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+class ContentItemStats(Base):
+    __tablename__ = "content_item_stats"
+
+    content_item_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("content_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    starts: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    completions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    timed_completions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_seconds: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class SkillStats(Base):
+    __tablename__ = "skill_stats"
+
+    skill_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True
+    )
+    starts: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    completions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    timed_completions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_seconds: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_event_id: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
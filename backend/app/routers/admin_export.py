@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.core.deps import engine, get_admin_user
+from app.models import ContentItem, LearningEvent, User
+
+router = APIRouter(
+    prefix="/admin/export",
+    tags=["admin"],
+    dependencies=[Depends(get_admin_user)],
+)
+
+FETCH_ROWS = 2000          # rows per server-side cursor fetch
+FLUSH_BYTES = 64 * 1024    # bytes buffered before each yield
+
+
+def _iso(v: Optional[datetime]) -> Optional[str]:
+    return v.isoformat() if v is not None else None
+
+
+def _str(v: Any) -> Optional[str]:
+    return str(v) if v is not None else None
+
+
+def _same(v: Any) -> Any:
+    return v
+
+
+# (output key, column, converter); the first column is the resume cursor
+ExportSpec = Sequence[Tuple[str, Any, Callable[[Any], Any]]]
+
+USERS: ExportSpec = (
+    ("id", User.id, _str),
+    ("email", User.email, _same),
+    ("provider", User.provider, _same),
+    ("created_at", User.created_at, _iso),
+)
+
+CONTENT: ExportSpec = (
+    ("id", ContentItem.id, _str),
+    ("slug", ContentItem.slug, _same),
+    ("title", ContentItem.title, _same),
+    ("content_type", ContentItem.content_type, _same),
+    ("difficulty", ContentItem.difficulty, _same),
+    ("url", ContentItem.url, _same),
+    ("est_minutes", ContentItem.est_minutes, _same),
+    ("is_active", ContentItem.is_active, _same),
+    ("created_at", ContentItem.created_at, _iso),
+)
+
+EVENTS: ExportSpec = (
+    ("id", LearningEvent.id, _same),
+    ("user_id", LearningEvent.user_id, _str),
+    ("content_item_id", LearningEvent.content_item_id, _str),
+    ("event_type", LearningEvent.event_type, _same),
+    ("duration_seconds", LearningEvent.duration_seconds, _same),
+    ("correct", LearningEvent.correct, _same),
+    ("created_at", LearningEvent.created_at, _iso),
+)
+
+
+def _ndjson_lines(spec: ExportSpec, after: Any, limit: Optional[int]) -> Iterator[bytes]:
+    """
+    Rows as NDJSON, in cursor-column order, read through a server-side cursor
+    on a dedicated connection (not the request session, which may be closed
+    before the body finishes streaming). Output is flushed in ~64KB chunks.
+    """
+    keys = [k for k, _, _ in spec]
+    convs = [c for _, _, c in spec]
+    cursor_col = spec[0][1]
+    stmt = select(*(col for _, col, _ in spec)).order_by(cursor_col)
+    if after is not None:
+        stmt = stmt.where(cursor_col > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=FETCH_ROWS).execute(stmt)
+        buf = []
+        size = 0
+        for row in result:
+            line = dumps({k: conv(v) for k, conv, v in zip(keys, convs, row)}).encode("utf-8") + b"\n"
+            buf.append(line)
+            size += len(line)
+            if size >= FLUSH_BYTES:
+                yield b"".join(buf)
+                buf, size = [], 0
+        if buf:
+            yield b"".join(buf)
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: listed (or covered by "*")
+    with a non-zero q-value. "gzip;q=0" explicitly refuses it.
+    """
+    if not accept_encoding:
+        return False
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip()] = q
+    q = weights.get("gzip", weights.get("x-gzip", weights.get("*", 0.0)))
+    return q > 0
+
+
+def _stream(spec: ExportSpec, after: Any, limit: Optional[int], accept_encoding: Optional[str]) -> StreamingResponse:
+    body = _ndjson_lines(spec, after, limit)
+    headers = {"Cache-Control": "no-store"}
+    if _accepts_gzip(accept_encoding):
+        body = _gzip(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+def _uuid_cursor(after: Optional[str]) -> Optional[uuid.UUID]:
+    if after is None:
+        return None
+    try:
+        return uuid.UUID(after)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="'after' must be a UUID",
+        )
+
+
+@router.get("/users.ndjson")
+def export_users(
+    after: Optional[str] = Query(None, description="Resume after this user id (last id received)"),
+    limit: Optional[int] = Query(None, ge=1),
+    accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+) -> StreamingResponse:
+    """
+    Stream all users as NDJSON ordered by id. To resume an interrupted dump,
+    pass the id of the last complete line as `after`.
+    """
+    return _stream(USERS, _uuid_cursor(after), limit, accept_encoding)
+
+
+@router.get("/content.ndjson")
+def export_content(
+    after: Optional[str] = Query(None, description="Resume after this content item id"),
+    limit: Optional[int] = Query(None, ge=1),
+    accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+) -> StreamingResponse:
+    """
+    Stream the content catalog (including inactive items) as NDJSON ordered by id.
+    """
+    return _stream(CONTENT, _uuid_cursor(after), limit, accept_encoding)
+
+
+@router.get("/events.ndjson")
+def export_events(
+    after: Optional[int] = Query(None, ge=0, description="Resume after this event id"),
+    limit: Optional[int] = Query(None, ge=1),
+    accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+) -> StreamingResponse:
+    """
+    Stream learner progress events as NDJSON ordered by id.
+    """
+    return _stream(EVENTS, after, limit, accept_encoding)
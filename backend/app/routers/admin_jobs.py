@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_admin_user, get_db
+from app.schemas.job import JobIn, JobOut
+from app.services import job_handlers  # noqa: F401  (registers handlers)
+from app.services.jobs import enqueue, queue_metrics, registered_kinds
+
+router = APIRouter(
+    prefix="/admin/jobs",
+    tags=["admin"],
+    dependencies=[Depends(get_admin_user)],
+)
+
+
+@router.get("/metrics")
+def job_metrics(
+    window_seconds: float = Query(3600.0, gt=0, le=7 * 24 * 3600),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Queue depth by state, age of the oldest runnable job, and per-kind
+    wait/run latency percentiles over the window.
+    """
+    return queue_metrics(db, window_seconds=window_seconds)
+
+
+@router.post("", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_job(payload: JobIn, db: Session = Depends(get_db)) -> JobOut:
+    """
+    Queue a job for the worker, e.g. reviews.recompute after changing
+    REVIEW_* settings or embeddings.refresh after editing content.
+    """
+    kinds = registered_kinds()
+    if payload.kind not in kinds:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown job kind; expected one of: {', '.join(kinds)}",
+        )
+    j = enqueue(db, payload.kind, payload.payload, max_attempts=payload.max_attempts)
+    return JobOut(id=j.id, kind=j.kind, status=j.status)
@@ -2,14 +2,15 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import create_access_token, hash_password, password_needs_rehash, verify_password
 from app.schemas.auth import LoginIn, SignupIn, TokenOut
-from app.core.deps import get_db
+from app.core.deps import SessionLocal, get_db
+from app.db import queries
 
 # Adjust these imports if your models live elsewhere
 from app.models import User, Profile  # User: id, email, created_at, <hashed_password|password_hash>; Profile: user_id, <display_name|full_name|name>
@@ -38,14 +39,6 @@ def _set_user_password_hash(user: User, pwd_hash: str) -> None:
     )
 
 
-def _get_user_password_hash(user: User) -> Optional[str]:
-    if hasattr(user, "hashed_password"):
-        return getattr(user, "hashed_password")
-    if hasattr(user, "password_hash"):
-        return getattr(user, "password_hash")
-    return None
-
-
 def _create_profile_for_user(db: Session, user: User, display_name_in: Optional[str]) -> None:
     """
     Create a Profile row for the user, mapping display name to the first supported field.
@@ -77,12 +70,28 @@ def _create_profile_for_user(db: Session, user: User, display_name_in: Optional[
     db.add(profile)
 
 
+def _rehash_password(user_id, old_hash: str, plain_password: str) -> None:
+    """
+    Background task: upgrade a hash made with outdated Argon2 parameters.
+    Only replaces the exact hash that was verified, so a concurrent password
+    change is never overwritten.
+    """
+    new_hash = hash_password(plain_password)
+    with SessionLocal() as db:
+        db.execute(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        db.commit()
+
+
 @router.post("/signup", response_model=TokenOut, status_code=status.HTTP_201_CREATED)
 def signup(payload: SignupIn, db: Session = Depends(get_db)) -> TokenOut:
     email = _normalize_email(payload.email)
 
     # Reject duplicate email
-    existing = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    existing = db.execute(queries.USER_ID_BY_EMAIL, {"email": email}).scalar_one_or_none()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -128,22 +137,27 @@ def signup(payload: SignupIn, db: Session = Depends(get_db)) -> TokenOut:
 
 
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)) -> TokenOut:
+def login(payload: LoginIn, background_tasks: BackgroundTasks, db: Session = Depends(get_db)) -> TokenOut:
     email = _normalize_email(payload.email)
 
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-    if not user:
+    # Only the id and hash are needed, so skip loading a full ORM User
+    creds = db.execute(queries.CREDENTIALS_BY_EMAIL, {"email": email}).one_or_none()
+    if not creds:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    stored_hash = _get_user_password_hash(user)
+    user_id, stored_hash = creds
     if not stored_hash or not verify_password(payload.password, stored_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    token = create_access_token(sub=str(getattr(user, "id")))
+    # Rehash after the response is sent so login latency stays at one verify
+    if password_needs_rehash(stored_hash):
+        background_tasks.add_task(_rehash_password, user_id, stored_hash, payload.password)
+
+    token = create_access_token(sub=str(user_id))
     return TokenOut(access_token=token)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import math
+import uuid
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_db
+from app.models import (
+    ContentItem,
+    ContentSkill,
+    ItemCalibration,
+    LearnerAbility,
+    LearningEvent,
+    User,
+)
+from app.schemas.challenge import AbilityOut, AnswerIn, NextChallengeOut
+from app.services import realtime
+from app.services.irt import (
+    THETA_PRIOR_PRECISION,
+    ItemBank,
+    item_information,
+    prior_difficulty,
+    select_max_information,
+    update_ability,
+)
+
+router = APIRouter(prefix="/me", tags=["challenges"])
+
+item_bank = ItemBank(ttl_seconds=settings.IRT_ITEM_BANK_TTL_SECONDS)
+
+
+@router.get("/next-challenge", response_model=NextChallengeOut)
+def next_challenge(
+    skill_id: uuid.UUID = Query(..., description="Skill to practise"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> NextChallengeOut:
+    """
+    Pick the challenge that is most informative at the learner's current
+    ability, skipping recently attempted ones.
+    """
+    items = item_bank.skill(db, skill_id)
+    if items is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No challenges for this skill",
+        )
+
+    theta = db.execute(
+        select(LearnerAbility.theta).where(
+            LearnerAbility.user_id == current_user.id, LearnerAbility.skill_id == skill_id
+        )
+    ).scalar_one_or_none() or 0.0
+
+    recent = db.execute(
+        select(LearningEvent.content_item_id)
+        .where(LearningEvent.user_id == current_user.id, LearningEvent.event_type == "attempt")
+        .order_by(LearningEvent.id.desc())
+        .limit(settings.IRT_RECENT_EXCLUDE)
+    ).scalars().all()
+
+    i = select_max_information(theta, items.a, items.b, items.exclusion_mask(recent))
+    if i < 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No unattempted challenges for this skill",
+        )
+
+    return NextChallengeOut(
+        content_item_id=items.ids[i],
+        skill_id=skill_id,
+        ability=theta,
+        item_difficulty=float(items.b[i]),
+        information=float(item_information(theta, items.a[i:i + 1], items.b[i:i + 1])[0]),
+    )
+
+
+@router.post("/challenges/{content_item_id}/answer", response_model=List[AbilityOut])
+def answer_challenge(
+    content_item_id: uuid.UUID,
+    payload: AnswerIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> List[AbilityOut]:
+    """
+    Record an attempt and update the learner's ability for each skill the
+    challenge covers. Returns the updated abilities.
+    """
+    row = db.execute(
+        select(ContentItem.difficulty, ItemCalibration.discrimination, ItemCalibration.difficulty)
+        .outerjoin(ItemCalibration, ItemCalibration.content_item_id == ContentItem.id)
+        .where(
+            ContentItem.id == content_item_id,
+            ContentItem.is_active,
+            ContentItem.content_type == "challenge",
+        )
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Challenge not found",
+        )
+    authored, a, b = row
+    a = a if a is not None else 1.0
+    b = b if b is not None else prior_difficulty(authored)
+
+    db.add(LearningEvent(
+        user_id=current_user.id,
+        content_item_id=content_item_id,
+        event_type="attempt",
+        duration_seconds=payload.duration_seconds,
+        correct=payload.correct,
+    ))
+
+    skill_ids = db.execute(
+        select(ContentSkill.skill_id).where(ContentSkill.content_item_id == content_item_id)
+    ).scalars().all()
+    if not skill_ids:
+        return []
+
+    # Make sure every ability row exists, then lock them in key order
+    db.execute(
+        insert(LearnerAbility)
+        .values([
+            {"user_id": current_user.id, "skill_id": s, "theta": 0.0, "precision": THETA_PRIOR_PRECISION}
+            for s in skill_ids
+        ])
+        .on_conflict_do_nothing(index_elements=["user_id", "skill_id"])
+    )
+    abilities = db.execute(
+        select(LearnerAbility)
+        .where(LearnerAbility.user_id == current_user.id, LearnerAbility.skill_id.in_(skill_ids))
+        .order_by(LearnerAbility.skill_id)
+        .with_for_update()
+    ).scalars().all()
+
+    out = []
+    for ability in abilities:
+        ability.theta, ability.precision = update_ability(
+            ability.theta, ability.precision, a, b, payload.correct
+        )
+        ability.n_responses += 1
+        out.append(AbilityOut(
+            skill_id=ability.skill_id,
+            theta=ability.theta,
+            standard_error=1.0 / math.sqrt(ability.precision),
+            n_responses=ability.n_responses,
+        ))
+    db.flush()
+
+    realtime.publish(db, current_user.id, "ability", [o.model_dump(mode="json") for o in out])
+    return out
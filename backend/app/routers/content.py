@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import get_db
+from app.schemas.content import ContentStatsOut
+from app.services.rollups import StatsCache
+
+router = APIRouter(prefix="/content", tags=["content"])
+
+stats_cache = StatsCache(ttl_seconds=settings.STATS_CACHE_TTL_SECONDS)
+
+
+@router.get("/popular", response_model=List[ContentStatsOut])
+def list_popular(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> List[ContentStatsOut]:
+    """
+    Most-completed active content items, served from the in-memory rollup snapshot.
+    """
+    return [
+        ContentStatsOut(
+            content_item_id=item_id,
+            starts=s.starts,
+            completions=s.completions,
+            completion_rate=s.completion_rate,
+            avg_seconds=s.avg_seconds,
+            time_vs_estimate=s.time_vs_estimate,
+        )
+        for item_id, s in stats_cache.popular(db, limit)
+    ]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_db
+from app.models import ContentItem, LearningEvent, User
+from app.schemas.event import EventIn, EventOut
+from app.services import realtime
+from app.services.jobs import enqueue
+
+router = APIRouter(prefix="/me", tags=["events"])
+
+
+@router.post("/events", response_model=EventOut, status_code=status.HTTP_201_CREATED)
+def record_event(
+    payload: EventIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> EventOut:
+    """
+    Append a learning event. Aggregates are maintained asynchronously by the
+    rollups.incremental job, queued here at most once at a time.
+    """
+    exists = db.execute(
+        select(ContentItem.id).where(ContentItem.id == payload.content_item_id, ContentItem.is_active)
+    ).scalar_one_or_none()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content item not found",
+        )
+
+    event = LearningEvent(
+        user_id=current_user.id,
+        content_item_id=payload.content_item_id,
+        event_type=payload.event_type,
+        duration_seconds=payload.duration_seconds,
+    )
+    db.add(event)
+    db.flush()
+
+    # Fold it into the popularity rollups once it is past the settle window;
+    # one queued run covers every event recorded before it starts
+    enqueue(
+        db,
+        "rollups.incremental",
+        run_at=datetime.now(timezone.utc) + timedelta(seconds=settings.ROLLUP_SETTLE_SECONDS),
+        unique=True,
+    )
+
+    realtime.publish(db, current_user.id, "progress", {
+        "content_item_id": str(event.content_item_id),
+        "event_type": event.event_type,
+    })
+    return EventOut(id=event.id)
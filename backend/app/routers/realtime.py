@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.deps import WWW_AUTH_VALUE, get_current_user
+from app.core.security import REALTIME_TICKET_TYPE, create_realtime_ticket, decode_token
+from app.models import User
+from app.schemas.realtime import TicketOut
+from app.services.realtime import Hub, Subscriber
+
+router = APIRouter(tags=["realtime"])
+
+hub = Hub(
+    max_connections=settings.REALTIME_MAX_CONNECTIONS,
+    max_per_user=settings.REALTIME_MAX_PER_USER,
+    max_pending=settings.REALTIME_QUEUE_SIZE,
+    heartbeat_seconds=settings.REALTIME_HEARTBEAT_SECONDS,
+    idle_seconds=settings.REALTIME_IDLE_SECONDS,
+)
+
+WS_POLICY_VIOLATION = 1008
+WS_TRY_AGAIN_LATER = 1013
+
+
+def _authenticate(authorization: Optional[str], ticket: Optional[str]) -> Optional[tuple[str, Optional[float]]]:
+    """
+    (user id, session expiry) from a Bearer access token or a `ticket` query
+    parameter from POST /realtime/ticket (browsers can't set headers on
+    WebSocket/EventSource). Access tokens are never taken from the URL, where
+    proxies and access logs would record them. Credentials are only decoded,
+    not looked up: idle connections never touch the database.
+    """
+    token, expected_type, exp_claim = ticket, REALTIME_TICKET_TYPE, "session_exp"
+    if authorization:
+        parts = authorization.split()
+        if len(parts) == 2 and parts[0].lower() == "bearer":
+            token, expected_type, exp_claim = parts[1], "access", "exp"
+    if not token:
+        return None
+    try:
+        payload = decode_token(token)
+    except Exception:
+        return None
+    user_id = str(payload.get("sub", "")).strip()
+    if not user_id or payload.get("type", "access") != expected_type:
+        return None
+    exp = payload.get(exp_claim)
+    return user_id, float(exp) if exp is not None else None
+
+
+@router.post("/realtime/ticket", response_model=TicketOut)
+def issue_ticket(
+    current_user: User = Depends(get_current_user),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+) -> TicketOut:
+    """
+    Ticket for opening /ws or /sse from a browser: pass it as `?ticket=`.
+    It expires after REALTIME_TICKET_SECONDS and only opens realtime
+    connections, so a copy left in an access log is of little use.
+    """
+    auth = _authenticate(authorization, None)  # validated by get_current_user; read for its expiry
+    session_exp = auth[1] if auth else None
+    ticket = create_realtime_ticket(str(current_user.id), settings.REALTIME_TICKET_SECONDS, session_exp)
+    return TicketOut(ticket=ticket, expires_in=settings.REALTIME_TICKET_SECONDS)
+
+
+@router.websocket("/ws")
+async def websocket_stream(
+    websocket: WebSocket,
+    ticket: Optional[str] = Query(None),
+):
+    """
+    Push channel. Messages are JSON `{"type": ..., "data": ...}`; every one
+    is a hint to refetch the resource it names. The server sends
+    `{"type": "ping"}` when either side has been quiet; clients must send
+    something (e.g. "pong") at least every REALTIME_IDLE_SECONDS or they are
+    disconnected, so answering pings is enough.
+    """
+    auth = _authenticate(websocket.headers.get("authorization"), ticket)
+    if auth is None:
+        await websocket.close(code=WS_POLICY_VIOLATION)
+        return
+    sub = hub.subscribe(*auth)
+    if sub is None:
+        await websocket.close(code=WS_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept()
+    sender = asyncio.create_task(_send_ws(websocket, sub))
+    try:
+        # Anything the client sends counts as activity; the content is ignored
+        while True:
+            await websocket.receive_text()
+            sub.touch()
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the sender already closed the socket
+        pass
+    finally:
+        hub.unsubscribe(sub)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+
+async def _send_ws(websocket: WebSocket, sub: Subscriber) -> None:
+    while True:
+        frames = await sub.next_frames()
+        if frames is None:
+            code = WS_TRY_AGAIN_LATER if sub.close_reason == "slow consumer" else WS_POLICY_VIOLATION
+            try:
+                await websocket.close(code=code, reason=sub.close_reason)
+            except Exception:
+                pass
+            return
+        for f in frames:
+            await websocket.send_text(f)
+
+
+@router.get("/sse")
+async def sse_stream(
+    ticket: Optional[str] = Query(None),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+) -> StreamingResponse:
+    """
+    Server-sent events variant of /ws for clients that only need to listen.
+    Each event's data is the same JSON message /ws sends.
+    """
+    auth = _authenticate(authorization, ticket)
+    if auth is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": WWW_AUTH_VALUE},
+        )
+    sub = hub.subscribe(*auth)
+    if sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many connections",
+            headers={"Retry-After": "5"},
+        )
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                frames = await sub.next_frames()
+                if frames is None:
+                    return
+                yield "".join(f"data: {f}\n\n" for f in frames)
+                # No reverse channel: a write that didn't fail is our only liveness signal
+                sub.touch()
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_db
+from app.db.hooks import after_commit
+from app.models import ContentItem, ReviewItem, User
+from app.schemas.review import ReviewDueOut, ReviewEnqueueIn, ReviewGradeIn, ReviewStateOut
+from app.services import realtime
+from app.services.reviews import (
+    DueQueueCache,
+    ReviewState,
+    SchedulerParams,
+    initial_state,
+    schedule_next,
+)
+
+router = APIRouter(prefix="/me", tags=["reviews"])
+
+_params = SchedulerParams.from_settings(settings)
+_due_cache = DueQueueCache(
+    max_users=settings.REVIEW_CACHE_USERS,
+    ttl_seconds=settings.REVIEW_CACHE_TTL_SECONDS,
+)
+
+
+def _record_after_commit(db: Session, user_id: uuid.UUID, item_id: uuid.UUID, due_at: datetime) -> None:
+    # Only a committed schedule may reach the process-wide cache; other workers
+    # apply the same change from the "reviews" notification (see on_realtime)
+    after_commit(db, lambda: _due_cache.record(user_id, item_id, due_at))
+
+
+def on_realtime(user_id: str, topic: str, data: Any) -> None:
+    """
+    Hub listener keeping this worker's due cache in step with schedule changes
+    committed by any worker. Registered for "reviews" and "resync".
+    """
+    if topic == "resync":
+        _due_cache.invalidate()  # notifications may have been missed
+        return
+    try:
+        uid = uuid.UUID(user_id)
+    except ValueError:
+        return
+    try:
+        _due_cache.record(uid, uuid.UUID(data["content_item_id"]), datetime.fromisoformat(data["due_at"]))
+    except (KeyError, TypeError, ValueError):
+        _due_cache.invalidate(uid)  # payload without the schedule (e.g. oversized)
+
+
+def _due_stmt(user_id: uuid.UUID):
+    # Ordered by the (user_id, due_at) index so LIMIT stops early
+    return (
+        select(ReviewItem.due_at, ReviewItem.content_item_id)
+        .where(ReviewItem.user_id == user_id)
+        .order_by(ReviewItem.due_at)
+    )
+
+
+@router.get("/reviews/due", response_model=List[ReviewDueOut])
+def list_due_reviews(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> List[ReviewDueOut]:
+    """
+    Return the current user's review items that are due now, soonest first.
+    """
+    now = datetime.now(timezone.utc)
+    user_id = current_user.id
+
+    def _load(max_rows: int):
+        return [tuple(r) for r in db.execute(_due_stmt(user_id).limit(max_rows)).all()]
+
+    entries = _due_cache.due(user_id, now, limit, _load)
+    if entries is None:
+        stmt = _due_stmt(user_id).where(ReviewItem.due_at <= now).limit(limit)
+        entries = [tuple(r) for r in db.execute(stmt).all()]
+
+    return [ReviewDueOut(content_item_id=item_id, due_at=due_at) for due_at, item_id in entries]
+
+
+@router.post("/reviews", response_model=ReviewStateOut, status_code=status.HTTP_201_CREATED)
+def enqueue_review(
+    payload: ReviewEnqueueIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ReviewStateOut:
+    """
+    Start reviewing a completed content item. Re-enqueueing an item that is
+    already scheduled returns its existing state unchanged.
+    """
+    existing = db.get(ReviewItem, (current_user.id, payload.content_item_id))
+    if existing:
+        return ReviewStateOut.model_validate(existing)
+
+    content = db.get(ContentItem, payload.content_item_id)
+    if not content or not content.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content item not found",
+        )
+
+    now = datetime.now(timezone.utc)
+    state = initial_state(_params)
+    item = ReviewItem(
+        user_id=current_user.id,
+        content_item_id=payload.content_item_id,
+        ease=state.ease,
+        repetitions=state.repetitions,
+        lapses=state.lapses,
+        interval_days=state.interval_days,
+        due_at=now + timedelta(days=state.interval_days),
+    )
+    db.add(item)
+    db.flush()
+
+    _record_after_commit(db, current_user.id, item.content_item_id, item.due_at)
+    out = ReviewStateOut.model_validate(item)
+    realtime.publish(db, current_user.id, "reviews", out.model_dump(mode="json"))
+    return out
+
+
+@router.post("/reviews/{content_item_id}/grade", response_model=ReviewStateOut)
+def grade_review(
+    content_item_id: uuid.UUID,
+    payload: ReviewGradeIn,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ReviewStateOut:
+    """
+    Record a review result and reschedule the item.
+    """
+    stmt = (
+        select(ReviewItem)
+        .where(ReviewItem.user_id == current_user.id, ReviewItem.content_item_id == content_item_id)
+        .with_for_update()
+    )
+    item = db.execute(stmt).scalar_one_or_none()
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Review item not found",
+        )
+
+    now = datetime.now(timezone.utc)
+    state = schedule_next(
+        ReviewState(
+            ease=item.ease,
+            repetitions=item.repetitions,
+            lapses=item.lapses,
+            interval_days=item.interval_days,
+        ),
+        payload.grade,
+        _params,
+    )
+    item.ease = state.ease
+    item.repetitions = state.repetitions
+    item.lapses = state.lapses
+    item.interval_days = state.interval_days
+    item.last_reviewed_at = now
+    item.due_at = now + timedelta(days=state.interval_days)
+    db.flush()
+
+    _record_after_commit(db, current_user.id, item.content_item_id, item.due_at)
+    out = ReviewStateOut.model_validate(item)
+    realtime.publish(db, current_user.id, "reviews", out.model_dump(mode="json"))
+    return out
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import uuid
+from pydantic import BaseModel, Field
+
+
+class NextChallengeOut(BaseModel):
+    content_item_id: uuid.UUID
+    skill_id: uuid.UUID
+    ability: float = Field(..., description="Current ability estimate (logit scale)")
+    item_difficulty: float
+    information: float
+
+
+class AnswerIn(BaseModel):
+    correct: bool
+    duration_seconds: int | None = Field(None, ge=0)
+
+
+class AbilityOut(BaseModel):
+    skill_id: uuid.UUID
+    theta: float
+    standard_error: float
+    n_responses: int
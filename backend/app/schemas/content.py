@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import uuid
+from pydantic import BaseModel
+
+
+class ContentStatsOut(BaseModel):
+    content_item_id: uuid.UUID
+    starts: int
+    completions: int
+    completion_rate: float
+    avg_seconds: float | None = None
+    time_vs_estimate: float | None = None
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import uuid
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class EventIn(BaseModel):
+    content_item_id: uuid.UUID
+    event_type: Literal["start", "complete"]
+    duration_seconds: int | None = Field(None, ge=0, description="Time spent; only meaningful for 'complete'")
+
+
+class EventOut(BaseModel):
+    id: int
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+from pydantic import BaseModel, Field
+
+
+class JobIn(BaseModel):
+    kind: str = Field(..., description="Registered job kind, e.g. reviews.recompute")
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    max_attempts: int = Field(5, ge=1, le=50)
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
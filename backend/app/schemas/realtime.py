@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class TicketOut(BaseModel):
+    ticket: str = Field(..., description="Pass as ?ticket= to /ws or /sse")
+    expires_in: int = Field(..., description="Seconds left to open the connection")
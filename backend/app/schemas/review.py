@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any
+from pydantic import BaseModel, Field
+
+
+class ReviewEnqueueIn(BaseModel):
+    content_item_id: uuid.UUID = Field(..., description="Completed content item to start reviewing")
+
+
+class ReviewGradeIn(BaseModel):
+    grade: int = Field(..., ge=0, le=5, description="Recall quality, 0 (blackout) to 5 (perfect)")
+
+
+class ReviewDueOut(BaseModel):
+    content_item_id: uuid.UUID
+    due_at: datetime
+
+
+class ReviewStateOut(BaseModel):
+    content_item_id: uuid.UUID
+    ease: float
+    repetitions: int
+    lapses: int
+    interval_days: float
+    due_at: datetime
+    last_reviewed_at: datetime | None = None
+
+    model_config: Any = {
+        "from_attributes": True
+    }
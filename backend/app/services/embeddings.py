@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Select, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.types import EMBEDDING_DIM, to_pg_vector
+from app.models import ContentItem, Skill
+
+log = logging.getLogger("app.embeddings")
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Word unigrams + bigrams and character trigrams (for typos/inflections)."""
+    words = _WORD_RE.findall(text.lower())
+    tokens = list(words)
+    tokens.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for w in words:
+        padded = f"#{w}#"
+        tokens.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return tokens
+
+
+def _bucket(token: str, n_features: int) -> int:
+    # crc32 rather than hash(): must be stable across processes and runs
+    return zlib.crc32(token.encode("utf-8")) % n_features
+
+
+def hashed_counts(texts: Sequence[str], n_features: int) -> np.ndarray:
+    """Dense (len(texts), n_features) matrix of hashed token counts."""
+    out = np.zeros((len(texts), n_features), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = np.fromiter((_bucket(t, n_features) for t in tokenize(text)), dtype=np.int64)
+        if buckets.size:
+            np.add.at(out[row], buckets, 1.0)
+    return out
+
+
+def _l2_normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+@dataclass
+class EmbeddingModel:
+    """
+    Hashed n-gram TF-IDF followed by a truncated SVD projection.
+
+    `fit` is streaming: it takes an iterable of text batches twice (document
+    frequencies, then the n_features x n_features Gram matrix), so memory is
+    bounded by n_features**2 regardless of corpus size.
+    """
+    idf: np.ndarray          # (n_features,)
+    components: np.ndarray   # (n_features, dim)
+
+    @property
+    def n_features(self) -> int:
+        return int(self.idf.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.components.shape[1])
+
+    @property
+    def fingerprint(self) -> str:
+        """Changes whenever the projection changes, forcing re-embeds."""
+        h = hashlib.sha256()
+        h.update(self.idf.tobytes())
+        h.update(self.components.tobytes())
+        return h.hexdigest()[:16]
+
+    @classmethod
+    def fit(
+        cls,
+        batches: Callable[[], Iterable[Sequence[str]]],
+        dim: int,
+        n_features: int = 4096,
+    ) -> "EmbeddingModel":
+        df = np.zeros(n_features, dtype=np.float64)
+        n_docs = 0
+        for texts in batches():
+            counts = hashed_counts(texts, n_features)
+            df += (counts > 0).sum(axis=0)
+            n_docs += len(texts)
+        idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        gram = np.zeros((n_features, n_features), dtype=np.float64)
+        for texts in batches():
+            x = _tfidf(hashed_counts(texts, n_features), idf)
+            gram += x.T.astype(np.float64) @ x
+
+        # Right singular vectors of X are the top eigenvectors of X^T X
+        _, vecs = np.linalg.eigh(gram)
+        components = vecs[:, ::-1][:, :dim].astype(np.float32)
+        if components.shape[1] < dim:  # tiny vocabularies
+            pad = np.zeros((n_features, dim - components.shape[1]), dtype=np.float32)
+            components = np.hstack([components, pad])
+        return cls(idf=idf, components=np.ascontiguousarray(components))
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32, L2-normalized rows."""
+        x = _tfidf(hashed_counts(texts, self.n_features), self.idf)
+        return _l2_normalize(x @ self.components)
+
+    def save(self, path: str) -> None:
+        np.savez(path, idf=self.idf, components=self.components)
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingModel":
+        with np.load(path) as data:
+            return cls(idf=data["idf"], components=data["components"])
+
+
+def _tfidf(counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    # Sublinear tf, then row-normalize so long descriptions don't dominate
+    tf = np.where(counts > 0, 1.0 + np.log(np.maximum(counts, 1.0)), 0.0).astype(np.float32)
+    return _l2_normalize(tf * idf)
+
+
+def content_hash(text: str, model_fingerprint: str) -> str:
+    """Stored next to each vector; a row is re-embedded only when this changes."""
+    return hashlib.sha256(f"{model_fingerprint}\0{text}".encode("utf-8")).hexdigest()
+
+
+def content_item_text(title: str, slug: str, content_type: str) -> str:
+    return f"{title}\n{slug.replace('-', ' ')}\n{content_type}"
+
+
+def skill_text(name: str, slug: str, domain: str, description: Optional[str]) -> str:
+    return f"{name}\n{slug.replace('-', ' ')}\n{domain}\n{description or ''}"
+
+
+# --- Database pipeline (app.tools.embed_content, the embeddings.refresh job) ---
+@dataclass(frozen=True)
+class Source:
+    table: str
+    stmt: Select
+    to_text: Callable[..., str]
+
+
+SOURCES = (
+    Source(
+        table="content_items",
+        stmt=select(
+            ContentItem.id, ContentItem.embedding_hash,
+            ContentItem.title, ContentItem.slug, ContentItem.content_type,
+        ).where(ContentItem.is_active),
+        to_text=lambda r: content_item_text(r.title, r.slug, r.content_type),
+    ),
+    Source(
+        table="skills",
+        stmt=select(
+            Skill.id, Skill.embedding_hash,
+            Skill.name, Skill.slug, Skill.domain, Skill.description,
+        ),
+        to_text=lambda r: skill_text(r.name, r.slug, r.domain, r.description),
+    ),
+)
+
+
+def _stream(conn: Connection, stmt: Select, batch_size: int) -> Iterator[Sequence]:
+    """Yield row batches from a server-side cursor."""
+    result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+    yield from result.partitions()
+
+
+def _iter_texts(eng: Engine, batch_size: int) -> Iterator[List[str]]:
+    with eng.connect() as conn:
+        for source in SOURCES:
+            for rows in _stream(conn, source.stmt, batch_size):
+                yield [source.to_text(r) for r in rows]
+
+
+# --- Embedding process side ---
+_model: Optional[EmbeddingModel] = None
+
+
+def _init_worker(idf: np.ndarray, components: np.ndarray) -> None:
+    global _model
+    _model = EmbeddingModel(idf=idf, components=components)
+
+
+def _embed(texts: List[str]) -> np.ndarray:
+    assert _model is not None
+    return _model.transform(texts)
+
+
+# --- Writer ---
+def _write_batch(conn: Connection, table: str, ids: Sequence, vectors: np.ndarray, hashes: Sequence[str]) -> None:
+    params = {}
+    values = []
+    for i, (row_id, vec, h) in enumerate(zip(ids, vectors, hashes)):
+        params[f"id{i}"] = row_id
+        params[f"e{i}"] = to_pg_vector(vec)
+        params[f"h{i}"] = h
+        values.append(f"(CAST(:id{i} AS uuid), CAST(:e{i} AS vector), :h{i})")
+    conn.execute(
+        text(
+            f"UPDATE {table} AS t SET embedding = v.embedding, embedding_hash = v.h "
+            f"FROM (VALUES {', '.join(values)}) AS v(id, embedding, h) WHERE t.id = v.id"
+        ),
+        params,
+    )
+    conn.commit()
+
+
+def run(eng: Engine, model: EmbeddingModel, workers: int, batch_size: int) -> Tuple[int, int]:
+    """
+    Embed every active content item and skill whose text (or the model)
+    changed since it was last embedded; returns (rows scanned, rows written).
+    Rows are streamed through a server-side cursor, embedded in a process
+    pool and written back with one UPDATE ... FROM (VALUES ...) per batch.
+    """
+    fingerprint = model.fingerprint
+    scanned = written = 0
+    pending: Deque[Tuple[Future, str, list, list]] = deque()
+
+    def _drain(writer: Connection, keep: int) -> None:
+        nonlocal written
+        while len(pending) > keep:
+            fut, table, ids, hashes = pending.popleft()
+            _write_batch(writer, table, ids, fut.result(), hashes)
+            written += len(ids)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(model.idf, model.components),
+    ) as pool, eng.connect() as reader, eng.connect() as writer:
+        for source in SOURCES:
+            for rows in _stream(reader, source.stmt, batch_size):
+                scanned += len(rows)
+                ids, texts, hashes = [], [], []
+                for r in rows:
+                    t = source.to_text(r)
+                    h = content_hash(t, fingerprint)
+                    if h != r.embedding_hash:
+                        ids.append(r.id)
+                        texts.append(t)
+                        hashes.append(h)
+                if ids:
+                    pending.append((pool.submit(_embed, texts), source.table, ids, hashes))
+                # Bound in-flight batches so memory stays flat on big tables
+                _drain(writer, keep=2 * workers)
+        _drain(writer, keep=0)
+    return scanned, written
+
+
+def load_or_fit(
+    eng: Engine, path: str, refit: bool = False, batch_size: int = 512, n_features: int = 4096
+) -> EmbeddingModel:
+    """The saved model, or a freshly fitted (and saved) one if asked or none exists."""
+    if not refit and os.path.exists(path):
+        model = EmbeddingModel.load(path)
+    else:
+        started = time.perf_counter()
+        model = EmbeddingModel.fit(
+            lambda: _iter_texts(eng, batch_size),
+            dim=EMBEDDING_DIM,
+            n_features=n_features,
+        )
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        model.save(path)
+        log.info("fitted embedding model in %.1fs -> %s", time.perf_counter() - started, path)
+    if model.dim != EMBEDDING_DIM:
+        raise ValueError(f"model dim {model.dim} != column dim {EMBEDDING_DIM}; refit")
+    return model
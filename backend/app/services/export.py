@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+import sqlalchemy as sa
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import INTERVAL
+from sqlalchemy.engine import Connection
+
+from app.models import (
+    ContentItem,
+    ContentSkill,
+    LearningEvent,
+    Profile,
+    ReviewItem,
+    Skill,
+    User,
+)
+
+WATERMARK_FILE = "_watermarks.json"
+# Work directories inside each table directory. The leading underscore keeps
+# them out of partitioned-dataset readers (Arrow, Spark, Hive all skip it).
+STAGING_PREFIX = "_staging-"
+REPLACED_PREFIX = "_replaced-"
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """
+    One exported table. With a `watermark` column the export is incremental
+    (each run writes only rows past the last exported value, so the union of
+    all partitions is the table); without one each run is a full snapshot.
+    """
+    name: str
+    columns: Sequence[Any]
+    watermark: Optional[Any] = None
+    # Rows newer than this are left for the next run (their neighbours may
+    # still be uncommitted). With a watermark the run stops just before the
+    # first unsettled row, so it always exports a prefix of the watermark order.
+    settle_column: Optional[Any] = None
+
+
+TABLES: Dict[str, ExportTable] = {
+    t.name: t
+    for t in (
+        # password_hash is deliberately never exported
+        ExportTable(
+            "users",
+            (User.id, User.email, User.provider, User.created_at),
+            watermark=User.created_at,
+            settle_column=User.created_at,
+        ),
+        ExportTable("profiles", (Profile.user_id, Profile.display_name, Profile.avatar_url, Profile.timezone)),
+        ExportTable(
+            "content_items",
+            (
+                ContentItem.id, ContentItem.slug, ContentItem.title, ContentItem.content_type,
+                ContentItem.difficulty, ContentItem.url, ContentItem.est_minutes,
+                ContentItem.is_active, ContentItem.created_at,
+            ),
+        ),
+        ExportTable("skills", (Skill.id, Skill.slug, Skill.name, Skill.domain, Skill.description, Skill.created_at)),
+        ExportTable("content_item_skills", (ContentSkill.content_item_id, ContentSkill.skill_id)),
+        ExportTable(
+            "learning_events",
+            (
+                LearningEvent.id, LearningEvent.user_id, LearningEvent.content_item_id,
+                LearningEvent.event_type, LearningEvent.duration_seconds, LearningEvent.correct,
+                LearningEvent.created_at,
+            ),
+            watermark=LearningEvent.id,
+            settle_column=LearningEvent.created_at,
+        ),
+        ExportTable(
+            "review_queue",
+            (
+                ReviewItem.user_id, ReviewItem.content_item_id, ReviewItem.ease, ReviewItem.repetitions,
+                ReviewItem.lapses, ReviewItem.interval_days, ReviewItem.due_at, ReviewItem.last_reviewed_at,
+            ),
+        ),
+    )
+}
+
+
+# --- Arrow schema ---
+def _arrow_type(col_type: sa.types.TypeEngine) -> pa.DataType:
+    if isinstance(col_type, sa.Uuid):
+        return pa.string()
+    if isinstance(col_type, sa.DateTime):
+        return pa.timestamp("us", tz="UTC") if col_type.timezone else pa.timestamp("us")
+    if isinstance(col_type, sa.BigInteger):
+        return pa.int64()
+    if isinstance(col_type, sa.Integer):
+        return pa.int32()
+    if isinstance(col_type, sa.Float):
+        return pa.float64()
+    if isinstance(col_type, sa.Boolean):
+        return pa.bool_()
+    if isinstance(col_type, (sa.String, sa.Text)):
+        return pa.string()
+    raise TypeError(f"no Arrow mapping for column type {col_type!r}")
+
+
+def arrow_schema(table: ExportTable) -> pa.Schema:
+    return pa.schema([pa.field(c.key, _arrow_type(c.type)) for c in table.columns])
+
+
+def rows_to_batch(rows: Sequence[Sequence[Any]], schema: pa.Schema) -> pa.RecordBatch:
+    """Column-wise conversion of one chunk of DB rows."""
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [r[i] for r in rows]
+        if pa.types.is_string(field.type):
+            values = [str(v) if isinstance(v, uuid.UUID) else v for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# --- Watermarks ---
+def load_watermarks(out_dir: str) -> Dict[str, Any]:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_watermarks(out_dir: str, marks: Dict[str, Any]) -> None:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(marks, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)  # atomic: a crashed run leaves the old marks
+
+
+def _encode_mark(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _decode_mark(value: Any, column: Any) -> Any:
+    if isinstance(column.type, sa.DateTime) and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+# --- File writers ---
+class _PartWriter:
+    """
+    Writes record batches into size-capped files under one directory. Files
+    are written under a temporary name and renamed on close, so a directory
+    listing never shows partial files.
+    """
+
+    def __init__(self, directory: str, prefix: str, schema: pa.Schema, fmt: str, rows_per_file: int):
+        self.directory = directory
+        self.prefix = prefix
+        self.schema = schema
+        self.fmt = fmt
+        self.rows_per_file = rows_per_file
+        self.files: List[str] = []
+        self._writer = None
+        self._path: Optional[str] = None
+        self._rows = 0
+
+    def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        ext = "parquet" if self.fmt == "parquet" else "arrow"
+        self._path = os.path.join(self.directory, f"{self.prefix}-{len(self.files):05d}.{ext}")
+        tmp = f"{self._path}.tmp"
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(tmp, self.schema, compression="zstd")
+        else:
+            self._writer = pa_ipc.new_file(tmp, self.schema)
+        self._rows = 0
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        if self._writer is None:
+            self._open()
+        if self.fmt == "parquet":
+            self._writer.write_batch(batch)  # one row group per chunk
+        else:
+            self._writer.write(batch)
+        self._rows += batch.num_rows
+        if self._rows >= self.rows_per_file:
+            self._close_file()
+
+    def _close_file(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(f"{self._path}.tmp", self._path)
+        self.files.append(self._path)
+        self._writer = None
+
+    def close(self) -> List[str]:
+        self._close_file()
+        return self.files
+
+    def abort(self) -> None:
+        """Drop the file in progress; already-closed parts stay published."""
+        if self._writer is not None:
+            self._writer.close()
+            os.remove(f"{self._path}.tmp")
+            self._writer = None
+
+
+def _publish(staging: str, target: str, replace: bool) -> None:
+    """
+    Move a finished run's directory into place with one rename. With
+    `replace`, an existing `target` is swapped out and removed.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    old = None
+    if replace and os.path.exists(target):
+        old = os.path.join(os.path.dirname(staging), REPLACED_PREFIX + os.path.basename(staging)[len(STAGING_PREFIX):])
+        os.rename(target, old)
+    try:
+        os.rename(staging, target)
+    except OSError:
+        if old is not None:
+            os.rename(old, target)
+        raise
+    if old is not None:
+        shutil.rmtree(old)
+
+
+def _remove_leftovers(out_dir: str, tables: Sequence[str]) -> None:
+    """Delete work directories left behind by runs that were killed outright."""
+    for name in tables:
+        table_dir = os.path.join(out_dir, name)
+        if not os.path.isdir(table_dir):
+            continue
+        for entry in os.listdir(table_dir):
+            if entry.startswith((STAGING_PREFIX, REPLACED_PREFIX)):
+                shutil.rmtree(os.path.join(table_dir, entry), ignore_errors=True)
+
+
+def _settle_cutoff(settle_seconds: float):
+    return func.now() - sa.cast(sa.literal(f"{float(settle_seconds)} seconds"), INTERVAL)
+
+
+def _first_unsettled(conn: Connection, table: ExportTable, since: Any, settle_seconds: float) -> Any:
+    """Lowest watermark past `since` whose row is still inside the settle window."""
+    stmt = select(func.min(table.watermark)).where(table.settle_column >= _settle_cutoff(settle_seconds))
+    if since is not None:
+        stmt = stmt.where(table.watermark > since)
+    return conn.execute(stmt).scalar()
+
+
+def _stream(conn: Connection, stmt, chunk_rows: int) -> Iterator[Sequence[Any]]:
+    result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(stmt)
+    yield from result.partitions()
+
+
+@dataclass
+class ExportResult:
+    table: str
+    rows: int
+    files: List[str]
+    watermark: Any = None
+
+
+def export_table(
+    conn: Connection,
+    table: ExportTable,
+    out_dir: str,
+    since: Any = None,
+    fmt: str = "parquet",
+    chunk_rows: int = 50_000,
+    rows_per_file: int = 1_000_000,
+    settle_seconds: float = 60.0,
+    run_id: Optional[str] = None,
+) -> ExportResult:
+    """
+    Stream one table into Parquet/Arrow files. At most `chunk_rows` rows are
+    held in Python at a time.
+
+    The run is written to a staging directory and published only once it
+    completes, so a failed run leaves nothing behind for readers:
+    incremental tables gain `<table>/export_date=YYYY-MM-DD/run=<run_id>/`,
+    snapshot tables replace that day's `<table>/export_date=YYYY-MM-DD/`
+    (a second run on the same day doesn't add a second snapshot).
+    """
+    now = datetime.now(timezone.utc)
+    run_id = run_id or now.strftime("%Y%m%dT%H%M%S")
+    schema = arrow_schema(table)
+
+    stmt = select(*table.columns)
+    if table.watermark is not None:
+        if since is not None:
+            stmt = stmt.where(table.watermark > since)
+        if table.settle_column is not None:
+            # Filtering unsettled rows out instead would let a later watermark
+            # through ahead of them, and the next run (> watermark) would skip
+            # them for good
+            bound = _first_unsettled(conn, table, since, settle_seconds)
+            if bound is not None:
+                stmt = stmt.where(table.watermark < bound)
+        stmt = stmt.order_by(table.watermark)
+    elif table.settle_column is not None:
+        stmt = stmt.where(table.settle_column < _settle_cutoff(settle_seconds))
+
+    table_dir = os.path.join(out_dir, table.name)
+    partition = os.path.join(table_dir, f"export_date={now:%Y-%m-%d}")
+    target = partition if table.watermark is None else os.path.join(partition, f"run={run_id}")
+    staging = os.path.join(table_dir, STAGING_PREFIX + run_id)
+    os.makedirs(staging)
+    writer = _PartWriter(staging, "part", schema, fmt, rows_per_file)
+    wm_index = next((i for i, c in enumerate(table.columns) if c is table.watermark), None)
+
+    rows = 0
+    last = since
+    try:
+        for chunk in _stream(conn, stmt, chunk_rows):
+            writer.write(rows_to_batch(chunk, schema))
+            rows += len(chunk)
+            if wm_index is not None:
+                last = chunk[-1][wm_index]
+        staged = writer.close()
+        if rows == 0 and table.watermark is not None:
+            # Nothing new; an empty snapshot still replaces the day's partition
+            shutil.rmtree(staging)
+            return ExportResult(table=table.name, rows=0, files=[], watermark=last)
+        _publish(staging, target, replace=table.watermark is None)
+    except BaseException:
+        writer.abort()
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    files = [os.path.join(target, os.path.basename(f)) for f in staged]
+    return ExportResult(table=table.name, rows=rows, files=files, watermark=last)
+
+
+def export_all(
+    conn: Connection,
+    out_dir: str,
+    tables: Sequence[str],
+    full: bool = False,
+    **kwargs: Any,
+) -> List[ExportResult]:
+    """
+    Export `tables`, resuming incremental tables from the watermarks stored in
+    `out_dir`. Watermarks are persisted right after each table's run is
+    published. Runs must not overlap on one `out_dir`.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    _remove_leftovers(out_dir, tables)
+    marks = {} if full else load_watermarks(out_dir)
+    results = []
+    for name in tables:
+        table = TABLES[name]
+        since = None
+        if table.watermark is not None and name in marks:
+            since = _decode_mark(marks[name], table.watermark)
+        result = export_table(conn, table, out_dir, since=since, **kwargs)
+        if table.watermark is not None and result.watermark is not None:
+            marks[name] = _encode_mark(result.watermark)
+            save_watermarks(out_dir, marks)
+        results.append(result)
+    return results
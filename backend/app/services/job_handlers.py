@@ -0,0 +1,47 @@
+"""
+Handlers for deferred work run by app.worker. Each handler opens its own
+session so it works the same in thread and process pools.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.idempotency import purge_expired
+from app.db.session import SessionLocal, engine
+from app.services.embeddings import load_or_fit, run
+from app.services.jobs import job
+from app.services.reviews import SchedulerParams, recompute_schedules
+from app.services.rollups import run_incremental
+
+
+@job("rollups.incremental")
+def rollups_incremental(payload: Dict[str, Any]) -> None:
+    with SessionLocal() as db:
+        run_incremental(
+            db,
+            batch_size=payload.get("batch_size", settings.ROLLUP_BATCH_SIZE),
+            settle_seconds=settings.ROLLUP_SETTLE_SECONDS,
+        )
+
+
+@job("reviews.recompute")
+def reviews_recompute(payload: Dict[str, Any]) -> None:
+    with SessionLocal() as db:
+        recompute_schedules(
+            db,
+            SchedulerParams.from_settings(settings),
+            batch_size=payload.get("batch_size", 5000),
+        )
+
+
+@job("idempotency.purge")
+def idempotency_purge(payload: Dict[str, Any]) -> None:
+    with SessionLocal() as db:
+        purge_expired(db)
+
+
+@job("embeddings.refresh")
+def embeddings_refresh(payload: Dict[str, Any]) -> None:
+    model = load_or_fit(engine, settings.EMBEDDING_MODEL_PATH, refit=payload.get("refit", False))
+    run(engine, model, workers=payload.get("workers", 1), batch_size=payload.get("batch_size", 512))
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import Job
+
+NOTIFY_CHANNEL = "jobs"
+
+# --- Handler registry ---
+JobHandler = Callable[[Dict[str, Any]], None]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register `fn(payload)` as the handler for jobs of this kind."""
+    def register(fn: JobHandler) -> JobHandler:
+        if kind in _handlers:
+            raise ValueError(f"duplicate job handler for {kind!r}")
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def registered_kinds() -> List[str]:
+    return sorted(_handlers)
+
+
+def get_handler(kind: str) -> JobHandler:
+    try:
+        return _handlers[kind]
+    except KeyError:
+        raise LookupError(f"no handler registered for job kind {kind!r}")
+
+
+# --- Producer side ---
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    run_at: Optional[datetime] = None,
+    max_attempts: int = 5,
+    unique: bool = False,
+) -> Optional[Job]:
+    """
+    Stage a job in the caller's transaction. Workers are woken by NOTIFY,
+    which Postgres delivers only if (and when) that transaction commits.
+
+    With unique=True nothing is staged (and None returned) while a job of
+    this kind is already waiting to run; for handlers that catch up on all
+    outstanding work, like rollups. Concurrent callers may still both
+    enqueue, which such handlers tolerate.
+    """
+    if unique and db.execute(
+        text("SELECT 1 FROM jobs WHERE kind = :kind AND status = 'queued' LIMIT 1"), {"kind": kind}
+    ).first():
+        return None
+    j = Job(kind=kind, payload=payload or {}, max_attempts=max_attempts)
+    if run_at is not None:
+        j.run_at = run_at
+    db.add(j)
+    db.flush()
+    db.execute(text("SELECT pg_notify(:ch, :kind)"), {"ch": NOTIFY_CHANNEL, "kind": kind})
+    return j
+
+
+# --- Worker side ---
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+_CLAIM = text("""
+    UPDATE jobs AS j
+    SET status = 'running', locked_by = :worker, started_at = now(), heartbeat_at = now(),
+        attempts = j.attempts + 1
+    FROM (
+        SELECT id FROM jobs
+        WHERE status = 'queued' AND run_at <= now()
+        ORDER BY run_at, id
+        LIMIT :n
+        FOR UPDATE SKIP LOCKED
+    ) AS ready
+    WHERE j.id = ready.id
+    RETURNING j.id, j.kind, j.payload, j.attempts, j.max_attempts
+""")
+
+
+def claim(db: Session, worker_id: str, n: int) -> List[ClaimedJob]:
+    """
+    Atomically claim up to `n` runnable jobs. SKIP LOCKED lets any number of
+    workers claim concurrently without blocking on each other's rows.
+    """
+    rows = db.execute(_CLAIM, {"worker": worker_id, "n": n}).all()
+    db.commit()
+    return [ClaimedJob(r.id, r.kind, r.payload, r.attempts, r.max_attempts) for r in rows]
+
+
+def heartbeat(db: Session, worker_id: str, job_ids: List[int]) -> int:
+    """Mark this worker's running jobs as alive so requeue_stale leaves them be."""
+    if not job_ids:
+        return 0
+    n = db.execute(
+        text("""
+            UPDATE jobs SET heartbeat_at = now()
+            WHERE id = ANY(:ids) AND status = 'running' AND locked_by = :worker
+        """),
+        {"ids": job_ids, "worker": worker_id},
+    ).rowcount
+    db.commit()
+    return n
+
+
+# Results only apply while this worker still owns the job: if it was
+# requeued as stale and claimed elsewhere, the late result is dropped.
+_OWNED = "id = :id AND status = 'running' AND locked_by = :worker"
+
+
+def mark_done(db: Session, claimed: ClaimedJob, worker_id: str) -> bool:
+    """Returns False if the job was no longer ours."""
+    n = db.execute(
+        text(f"UPDATE jobs SET status = 'done', finished_at = now(), last_error = NULL WHERE {_OWNED}"),
+        {"id": claimed.id, "worker": worker_id},
+    ).rowcount
+    db.commit()
+    return n == 1
+
+
+def retry_delay_seconds(attempts: int, base: float = 5.0, cap: float = 3600.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+def mark_failed(db: Session, claimed: ClaimedJob, worker_id: str, error: str) -> bool:
+    """Requeue with backoff, or fail permanently. Returns True if requeued."""
+    params = {"id": claimed.id, "worker": worker_id, "err": error[:4000]}
+    if claimed.attempts < claimed.max_attempts:
+        db.execute(
+            text(f"""
+                UPDATE jobs SET status = 'queued', locked_by = NULL, last_error = :err,
+                       run_at = now() + make_interval(secs => :delay)
+                WHERE {_OWNED}
+            """),
+            {**params, "delay": retry_delay_seconds(claimed.attempts)},
+        )
+        requeued = True
+    else:
+        db.execute(
+            text(f"UPDATE jobs SET status = 'failed', finished_at = now(), last_error = :err WHERE {_OWNED}"),
+            params,
+        )
+        requeued = False
+    db.commit()
+    return requeued
+
+
+def requeue_stale(db: Session, stale_seconds: float) -> int:
+    """
+    Return jobs whose worker stopped heartbeating to the queue, or fail them
+    if they have used up their attempts (a job that keeps killing its
+    worker must not be retried forever).
+    """
+    n = db.execute(
+        text("""
+            UPDATE jobs SET
+                status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                finished_at = CASE WHEN attempts >= max_attempts THEN now() END,
+                locked_by = NULL,
+                last_error = 'worker lost'
+            WHERE status = 'running'
+              AND coalesce(heartbeat_at, started_at) < now() - make_interval(secs => :s)
+        """),
+        {"s": stale_seconds},
+    ).rowcount
+    db.commit()
+    return n
+
+
+def purge_finished(db: Session, older_than_seconds: float) -> int:
+    """Delete completed jobs past retention; failed jobs are kept for inspection."""
+    n = db.execute(
+        text("DELETE FROM jobs WHERE status = 'done' AND finished_at < now() - make_interval(secs => :s)"),
+        {"s": older_than_seconds},
+    ).rowcount
+    db.commit()
+    return n
+
+
+# --- Metrics ---
+_METRICS = text("""
+    SELECT
+        count(*) FILTER (WHERE status = 'queued' AND run_at <= now()) AS ready,
+        count(*) FILTER (WHERE status = 'queued' AND run_at > now()) AS scheduled,
+        count(*) FILTER (WHERE status = 'running') AS running,
+        count(*) FILTER (WHERE status = 'failed') AS failed,
+        extract(epoch FROM now() - min(run_at) FILTER (WHERE status = 'queued' AND run_at <= now())) AS oldest_ready_seconds
+    FROM jobs
+    WHERE status <> 'done'
+""")
+
+_LATENCY = text("""
+    SELECT kind,
+           count(*) AS completed,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY extract(epoch FROM started_at - created_at)) AS wait_p50,
+           percentile_cont(0.95) WITHIN GROUP (ORDER BY extract(epoch FROM started_at - created_at)) AS wait_p95,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY extract(epoch FROM finished_at - started_at)) AS run_p50,
+           percentile_cont(0.95) WITHIN GROUP (ORDER BY extract(epoch FROM finished_at - started_at)) AS run_p95
+    FROM jobs
+    WHERE status = 'done' AND finished_at > now() - make_interval(secs => :window)
+    GROUP BY kind
+    ORDER BY kind
+""")
+
+
+def queue_metrics(db: Session, window_seconds: float = 3600.0) -> Dict[str, Any]:
+    """Queue depth by state plus per-kind wait/run latency percentiles."""
+    depth = db.execute(_METRICS).one()
+    latency = db.execute(_LATENCY, {"window": window_seconds}).all()
+    return {
+        "ready": depth.ready,
+        "scheduled": depth.scheduled,
+        "running": depth.running,
+        "failed": depth.failed,
+        "oldest_ready_seconds": float(depth.oldest_ready_seconds or 0.0),
+        "window_seconds": window_seconds,
+        "kinds": [
+            {
+                "kind": r.kind,
+                "completed": r.completed,
+                "wait_p50": r.wait_p50,
+                "wait_p95": r.wait_p95,
+                "run_p50": r.run_p50,
+                "run_p95": r.run_p95,
+            }
+            for r in latency
+        ],
+    }
@@ -0,0 +1,260 @@
+"""
+Server push fan-out.
+
+Producers call `publish()` inside their transaction; Postgres delivers the
+NOTIFY on commit to every API worker, whose `Hub` forwards it to that user's
+local connections (WebSocket or SSE, see app.routers.realtime) and to any
+in-process listeners for the topic (e.g. caches kept in step across workers).
+
+Each connection holds at most `max_pending` undelivered topics. A newer
+message for a topic that is still pending replaces the older one, so a burst
+of updates costs one frame. A client that lets more topics pile up is
+disconnected and resyncs on reconnect. One sweeper task per worker sends
+heartbeats and closes idle or expired connections, so an idle connection
+costs no timers of its own.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import psycopg
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+log = logging.getLogger("app.realtime")
+
+NOTIFY_CHANNEL = "realtime"
+MAX_NOTIFY_BYTES = 7900  # Postgres rejects NOTIFY payloads over 8000 bytes
+BROADCAST = "*"
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+
+
+def frame(topic: str, data: Any = None) -> str:
+    return _dumps({"type": topic, "data": data})
+
+
+# --- Producer side ---
+def publish(db: Session, user_id: Any, topic: str, data: Any = None) -> None:
+    """
+    Stage a push to `user_id` in the caller's transaction; nothing is sent if
+    it rolls back. Oversized payloads are sent without data, so clients
+    should treat every message as a hint to refetch what it names.
+    """
+    payload = _dumps({"u": str(user_id), "t": topic, "d": data})
+    if len(payload.encode("utf-8")) > MAX_NOTIFY_BYTES:
+        payload = _dumps({"u": str(user_id), "t": topic, "d": None})
+    db.execute(text("SELECT pg_notify(:ch, :p)"), {"ch": NOTIFY_CHANNEL, "p": payload})
+
+
+# --- Connections ---
+class Subscriber:
+    """One client connection: a small coalescing queue of encoded frames."""
+
+    __slots__ = ("user_id", "expires_at", "max_pending", "pending", "wake", "closed",
+                 "close_reason", "last_sent", "last_seen")
+
+    def __init__(self, user_id: str, expires_at: Optional[float], max_pending: int):
+        now = time.monotonic()
+        self.user_id = user_id
+        self.expires_at = expires_at  # wall-clock token expiry
+        self.max_pending = max_pending
+        self.pending: "OrderedDict[str, str]" = OrderedDict()
+        self.wake = asyncio.Event()
+        self.closed = False
+        self.close_reason = ""
+        self.last_sent = now
+        self.last_seen = now
+
+    def offer(self, topic: str, encoded: str) -> bool:
+        """Queue a frame; False if the connection is (now) closed."""
+        if self.closed:
+            return False
+        if topic in self.pending:
+            self.pending[topic] = encoded  # coalesce, keeping the original position
+        elif len(self.pending) >= self.max_pending:
+            self.close("slow consumer")
+            return False
+        else:
+            self.pending[topic] = encoded
+        self.wake.set()
+        return True
+
+    def close(self, reason: str) -> None:
+        if not self.closed:
+            self.closed = True
+            self.close_reason = reason
+            self.wake.set()
+
+    def touch(self) -> None:
+        """Record client activity (any frame received)."""
+        self.last_seen = time.monotonic()
+
+    async def next_frames(self) -> Optional[List[str]]:
+        """Wait for and drain queued frames; None once the connection is closed."""
+        while not self.pending and not self.closed:
+            self.wake.clear()
+            await self.wake.wait()
+        if self.closed:
+            return None
+        frames = list(self.pending.values())
+        self.pending.clear()
+        self.last_sent = time.monotonic()
+        return frames
+
+
+class Hub:
+    """Per-worker registry of connections, keyed by user id."""
+
+    def __init__(
+        self,
+        max_connections: int = 50_000,
+        max_per_user: int = 8,
+        max_pending: int = 64,
+        heartbeat_seconds: float = 25.0,
+        idle_seconds: float = 90.0,
+    ):
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.max_pending = max_pending
+        self.heartbeat_seconds = heartbeat_seconds
+        self.idle_seconds = idle_seconds
+        self._subs: Dict[str, Set[Subscriber]] = {}
+        self._count = 0
+        self._tasks: List[asyncio.Task] = []
+        self._listeners: Dict[str, List[Callable[[str, str, Any], None]]] = {}
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def connections(self) -> int:
+        return self._count
+
+    def subscribe(self, user_id: str, expires_at: Optional[float] = None) -> Optional[Subscriber]:
+        """Register a connection; None if this worker is at capacity."""
+        if self._count >= self.max_connections:
+            return None
+        subs = self._subs.setdefault(user_id, set())
+        # Closed connections stay registered until their handler unsubscribes;
+        # they neither count toward the limit nor make a useful victim
+        live = [s for s in subs if not s.closed]
+        if len(live) >= self.max_per_user:
+            min(live, key=lambda s: s.last_seen).close("too many connections")
+        sub = Subscriber(user_id, expires_at, self.max_pending)
+        subs.add(sub)
+        self._count += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        sub.close(sub.close_reason or "disconnected")
+        subs = self._subs.get(sub.user_id)
+        if subs is not None and sub in subs:
+            subs.discard(sub)
+            self._count -= 1
+            if not subs:
+                del self._subs[sub.user_id]
+
+    def add_listener(self, topic: str, fn: Callable[[str, str, Any], None]) -> None:
+        """
+        Call `fn(user_id, topic, data)` for every `topic` message this worker
+        receives, whether or not the user is connected here. Runs on the event
+        loop, so it must be quick and must not block.
+        """
+        self._listeners.setdefault(topic, []).append(fn)
+
+    def deliver(self, user_id: str, topic: str, data: Any = None) -> int:
+        """Fan a message out to local connections; returns how many accepted it."""
+        for fn in self._listeners.get(topic, ()):
+            try:
+                fn(user_id, topic, data)
+            except Exception:
+                log.exception("realtime listener for %r failed", topic)
+        targets = (
+            [s for subs in self._subs.values() for s in subs] if user_id == BROADCAST
+            else self._subs.get(user_id, ())
+        )
+        if not targets:
+            return 0
+        encoded = frame(topic, data)  # encoded once, shared by every connection
+        n = 0
+        for sub in list(targets):
+            if sub.offer(topic, encoded):
+                n += 1
+            else:
+                self.dropped += 1
+        self.delivered += n
+        return n
+
+    def dispatch(self, payload: str) -> int:
+        """Handle one NOTIFY payload produced by publish()."""
+        try:
+            msg = json.loads(payload)
+            return self.deliver(msg["u"], msg["t"], msg.get("d"))
+        except (ValueError, KeyError, TypeError):
+            log.warning("ignoring malformed realtime notification: %.200s", payload)
+            return 0
+
+    # --- Background tasks ---
+    def sweep(self) -> None:
+        """Heartbeat connections quiet in either direction; close idle and expired ones."""
+        mono = time.monotonic()
+        wall = time.time()
+        ping = frame("ping")
+        for subs in list(self._subs.values()):
+            for sub in list(subs):
+                if sub.expires_at is not None and wall >= sub.expires_at:
+                    sub.close("token expired")
+                elif mono - sub.last_seen > self.idle_seconds:
+                    sub.close("idle")
+                elif mono - min(sub.last_sent, sub.last_seen) >= self.heartbeat_seconds:
+                    # Also when only the client is quiet: a connection busy with
+                    # pushes would otherwise never be asked for a pong and be
+                    # dropped as idle
+                    sub.offer("ping", ping)
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds / 2)
+            self.sweep()
+
+    async def _listen_forever(self, dsn: str) -> None:
+        delay = 1.0
+        first = True
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    if not first:
+                        # Anything published while we were disconnected is lost
+                        self.deliver(BROADCAST, "resync")
+                    first = False
+                    delay = 1.0
+                    log.info("listening on %s", NOTIFY_CHANNEL)
+                    async for note in conn.notifies():
+                        self.dispatch(note.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("realtime listener lost (%s); reconnecting in %.0fs", e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    def start(self, dsn: str) -> None:
+        self._tasks = [
+            asyncio.create_task(self._listen_forever(dsn)),
+            asyncio.create_task(self._sweep_forever()),
+        ]
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for subs in list(self._subs.values()):
+            for sub in list(subs):
+                sub.close("server shutdown")
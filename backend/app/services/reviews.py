@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models import ReviewItem
+
+
+# --- Scheduler parameters ---
+@dataclass(frozen=True)
+class SchedulerParams:
+    """
+    SM-2 style parameters. Intervals are a closed-form function of
+    (repetitions, ease), so changing any of these can be re-applied to every
+    queued item without replaying review history.
+    """
+    initial_ease: float = 2.5
+    min_ease: float = 1.3
+    first_interval_days: float = 1.0
+    second_interval_days: float = 6.0
+    interval_modifier: float = 1.0
+    max_interval_days: float = 365.0
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "SchedulerParams":
+        return cls(
+            initial_ease=settings.REVIEW_INITIAL_EASE,
+            min_ease=settings.REVIEW_MIN_EASE,
+            first_interval_days=settings.REVIEW_FIRST_INTERVAL_DAYS,
+            second_interval_days=settings.REVIEW_SECOND_INTERVAL_DAYS,
+            interval_modifier=settings.REVIEW_INTERVAL_MODIFIER,
+            max_interval_days=settings.REVIEW_MAX_INTERVAL_DAYS,
+        )
+
+
+@dataclass(frozen=True)
+class ReviewState:
+    ease: float
+    repetitions: int
+    lapses: int
+    interval_days: float
+
+
+# --- Scalar scheduling (request path) ---
+def interval_days(repetitions: int, ease: float, params: SchedulerParams) -> float:
+    """
+    Interval after `repetitions` consecutive successful reviews:
+    first interval, then second interval, then growing by `ease` each time.
+    """
+    if repetitions <= 0:
+        days = params.first_interval_days
+    else:
+        days = params.second_interval_days * ease ** (repetitions - 1)
+    return min(days * params.interval_modifier, params.max_interval_days)
+
+
+def initial_state(params: SchedulerParams) -> ReviewState:
+    return ReviewState(
+        ease=params.initial_ease,
+        repetitions=0,
+        lapses=0,
+        interval_days=interval_days(0, params.initial_ease, params),
+    )
+
+
+def schedule_next(state: ReviewState, grade: int, params: SchedulerParams) -> ReviewState:
+    """
+    Apply one review graded 0..5 (SM-2 scale). Grades below 3 are lapses and
+    restart the repetition count; ease is adjusted for every grade.
+    """
+    if not 0 <= grade <= 5:
+        raise ValueError("grade must be between 0 and 5")
+
+    miss = 5 - grade
+    ease = max(params.min_ease, state.ease + (0.1 - miss * (0.08 + miss * 0.02)))
+    if grade < 3:
+        repetitions, lapses = 0, state.lapses + 1
+    else:
+        repetitions, lapses = state.repetitions + 1, state.lapses
+
+    return ReviewState(
+        ease=ease,
+        repetitions=repetitions,
+        lapses=lapses,
+        interval_days=interval_days(repetitions, ease, params),
+    )
+
+
+# --- Vectorized scheduling (batch recompute) ---
+def interval_days_batch(repetitions: np.ndarray, ease: np.ndarray, params: SchedulerParams) -> np.ndarray:
+    """NumPy equivalent of `interval_days` over whole columns."""
+    reps = np.asarray(repetitions, dtype=np.int64)
+    ease = np.asarray(ease, dtype=np.float64)
+    days = np.where(
+        reps <= 0,
+        params.first_interval_days,
+        params.second_interval_days * np.power(ease, np.maximum(reps - 1, 0)),
+    )
+    return np.minimum(days * params.interval_modifier, params.max_interval_days)
+
+
+def recompute_schedules(
+    db: Session,
+    params: SchedulerParams,
+    batch_size: int = 5000,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Re-derive interval_days/due_at for every queued item under `params`.
+
+    Walks review_queue in primary-key order (keyset pagination), computes each
+    page with NumPy and writes it back with a bulk UPDATE by primary key.
+    Each page is committed so a long run doesn't hold one huge transaction.
+    Returns the number of rows updated.
+    """
+    updated = 0
+    after: Optional[Tuple[uuid.UUID, uuid.UUID]] = None
+    while True:
+        stmt = (
+            select(
+                ReviewItem.user_id,
+                ReviewItem.content_item_id,
+                ReviewItem.repetitions,
+                ReviewItem.ease,
+                ReviewItem.last_reviewed_at,
+                ReviewItem.created_at,
+            )
+            .order_by(ReviewItem.user_id, ReviewItem.content_item_id)
+            .limit(batch_size)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(ReviewItem.user_id, ReviewItem.content_item_id) > after)
+        rows = db.execute(stmt).all()
+        if not rows:
+            break
+
+        reps = np.fromiter((r.repetitions for r in rows), dtype=np.int64, count=len(rows))
+        ease = np.fromiter((r.ease for r in rows), dtype=np.float64, count=len(rows))
+        days = interval_days_batch(reps, ease, params)
+
+        payload = []
+        for r, d in zip(rows, days.tolist()):
+            anchor = r.last_reviewed_at or r.created_at or now
+            payload.append({
+                "user_id": r.user_id,
+                "content_item_id": r.content_item_id,
+                "interval_days": d,
+                "due_at": anchor + timedelta(days=d),
+            })
+        db.execute(update(ReviewItem), payload)
+        db.commit()
+
+        updated += len(rows)
+        after = (rows[-1].user_id, rows[-1].content_item_id)
+    return updated
+
+
+# --- In-process due heap for hot users ---
+DueEntry = Tuple[datetime, uuid.UUID]
+
+
+class _UserHeap:
+    """Min-heap of (due_at, content_item_id) with lazy deletion of stale entries."""
+
+    def __init__(self, entries: Iterable[DueEntry], loaded_at: float):
+        self.current = {item_id: due for due, item_id in entries}
+        self.heap: List[DueEntry] = [(due, item_id) for item_id, due in self.current.items()]
+        heapq.heapify(self.heap)
+        self.loaded_at = loaded_at
+
+    def upsert(self, item_id: uuid.UUID, due_at: datetime) -> None:
+        self.current[item_id] = due_at
+        heapq.heappush(self.heap, (due_at, item_id))
+        # Keep stale entries from piling up after many reschedules
+        if len(self.heap) > 2 * len(self.current) + 64:
+            self.heap = [(due, i) for i, due in self.current.items()]
+            heapq.heapify(self.heap)
+
+    def pop_due(self, now: datetime, limit: int) -> List[DueEntry]:
+        """Return up to `limit` due entries in due order; O(limit * log n)."""
+        out: List[DueEntry] = []
+        while self.heap and len(out) < limit:
+            due, item_id = self.heap[0]
+            if self.current.get(item_id) != due:
+                heapq.heappop(self.heap)  # superseded entry
+                continue
+            if due > now:
+                break
+            out.append(heapq.heappop(self.heap))
+        for entry in out:
+            heapq.heappush(self.heap, entry)
+        return out
+
+
+class DueQueueCache:
+    """
+    Bounded LRU of per-user due heaps. Committed schedule changes are applied
+    in place via `record` (app.routers.reviews feeds it from every worker's
+    notifications); entries also expire after `ttl_seconds`, which bounds
+    staleness for writes that send none, such as a batch recompute.
+    """
+
+    def __init__(self, max_users: int = 1024, ttl_seconds: float = 30.0, max_items_per_user: int = 5000):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.max_items_per_user = max_items_per_user
+        self._users: "OrderedDict[uuid.UUID, _UserHeap]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def due(
+        self,
+        user_id: uuid.UUID,
+        now: datetime,
+        limit: int,
+        loader: Callable[[int], Sequence[DueEntry]],
+    ) -> Optional[List[DueEntry]]:
+        """
+        Due entries for a user, loading the user's queue via `loader(max_rows)`
+        on a miss. Returns None if the user's queue is too large to cache, in
+        which case the caller should query the index directly.
+        """
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and time.monotonic() - entry.loaded_at <= self.ttl_seconds:
+                self._users.move_to_end(user_id)
+                return entry.pop_due(now, limit)
+
+        rows = loader(self.max_items_per_user + 1)  # DB I/O outside the lock
+        if len(rows) > self.max_items_per_user:
+            return None
+
+        with self._lock:
+            entry = _UserHeap(rows, loaded_at=time.monotonic())
+            self._users[user_id] = entry
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+            return entry.pop_due(now, limit)
+
+    def record(self, user_id: uuid.UUID, item_id: uuid.UUID, due_at: datetime) -> None:
+        """Apply a local schedule change if the user is cached."""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                entry.upsert(item_id, due_at)
+
+    def invalidate(self, user_id: Optional[uuid.UUID] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.snapshots import TtlSnapshot
+
+WATERMARK_NAME = "content_stats"
+
+ITEM_TABLE = "content_item_stats"
+SKILL_TABLE = "skill_stats"
+STAGING_SUFFIX = "_backfill"
+
+# Both rollups fold the events in (lo, hi] into a summary table as deltas.
+# Rows are grouped and emitted in key order so concurrent backfill partitions
+# take row locks in the same order and cannot deadlock each other.
+_ITEM_ROLLUP_SQL = """
+    INSERT INTO {table} AS s
+        (content_item_id, starts, completions, timed_completions, total_seconds, updated_at)
+    SELECT e.content_item_id,
+           count(*) FILTER (WHERE e.event_type = 'start'),
+           count(*) FILTER (WHERE e.event_type = 'complete'),
+           count(e.duration_seconds) FILTER (WHERE e.event_type = 'complete'),
+           coalesce(sum(e.duration_seconds) FILTER (WHERE e.event_type = 'complete'), 0),
+           now()
+    FROM learning_events e
+    WHERE e.id > :lo AND e.id <= :hi
+    GROUP BY e.content_item_id
+    ORDER BY e.content_item_id
+    ON CONFLICT (content_item_id) DO UPDATE SET
+        starts = s.starts + EXCLUDED.starts,
+        completions = s.completions + EXCLUDED.completions,
+        timed_completions = s.timed_completions + EXCLUDED.timed_completions,
+        total_seconds = s.total_seconds + EXCLUDED.total_seconds,
+        updated_at = EXCLUDED.updated_at
+"""
+
+_SKILL_ROLLUP_SQL = """
+    INSERT INTO {table} AS s
+        (skill_id, starts, completions, timed_completions, total_seconds, updated_at)
+    SELECT cs.skill_id,
+           count(*) FILTER (WHERE e.event_type = 'start'),
+           count(*) FILTER (WHERE e.event_type = 'complete'),
+           count(e.duration_seconds) FILTER (WHERE e.event_type = 'complete'),
+           coalesce(sum(e.duration_seconds) FILTER (WHERE e.event_type = 'complete'), 0),
+           now()
+    FROM learning_events e
+    JOIN content_item_skills cs ON cs.content_item_id = e.content_item_id
+    WHERE e.id > :lo AND e.id <= :hi
+    GROUP BY cs.skill_id
+    ORDER BY cs.skill_id
+    ON CONFLICT (skill_id) DO UPDATE SET
+        starts = s.starts + EXCLUDED.starts,
+        completions = s.completions + EXCLUDED.completions,
+        timed_completions = s.timed_completions + EXCLUDED.timed_completions,
+        total_seconds = s.total_seconds + EXCLUDED.total_seconds,
+        updated_at = EXCLUDED.updated_at
+"""
+
+_ITEM_ROLLUP = text(_ITEM_ROLLUP_SQL.format(table=ITEM_TABLE))
+_SKILL_ROLLUP = text(_SKILL_ROLLUP_SQL.format(table=SKILL_TABLE))
+_ITEM_ROLLUP_STAGING = text(_ITEM_ROLLUP_SQL.format(table=ITEM_TABLE + STAGING_SUFFIX))
+_SKILL_ROLLUP_STAGING = text(_SKILL_ROLLUP_SQL.format(table=SKILL_TABLE + STAGING_SUFFIX))
+
+# Upper bound of the next batch: the last id before the first event that is
+# still inside the settle window (its neighbours may not be committed yet).
+_NEXT_HI = text("""
+    SELECT coalesce(
+               min(t.id) FILTER (WHERE t.created_at >= now() - make_interval(secs => :settle)) - 1,
+               max(t.id)
+           )
+    FROM (
+        SELECT id, created_at FROM learning_events
+        WHERE id > :lo ORDER BY id LIMIT :batch
+    ) t
+""")
+
+
+def _apply_range(db: Session, lo: int, hi: int, staging: bool = False) -> None:
+    params = {"lo": lo, "hi": hi}
+    db.execute(_ITEM_ROLLUP_STAGING if staging else _ITEM_ROLLUP, params)
+    db.execute(_SKILL_ROLLUP_STAGING if staging else _SKILL_ROLLUP, params)
+
+
+def _lock_watermark(db: Session, skip_locked: bool) -> Optional[int]:
+    """Lock the watermark row for this transaction; None if another runner holds it."""
+    db.execute(
+        text("INSERT INTO rollup_watermarks (name, last_event_id) VALUES (:n, 0) ON CONFLICT (name) DO NOTHING"),
+        {"n": WATERMARK_NAME},
+    )
+    suffix = " SKIP LOCKED" if skip_locked else ""
+    return db.execute(
+        text(f"SELECT last_event_id FROM rollup_watermarks WHERE name = :n FOR UPDATE{suffix}"),
+        {"n": WATERMARK_NAME},
+    ).scalar_one_or_none()
+
+
+def _set_watermark(db: Session, event_id: int) -> None:
+    db.execute(
+        text("UPDATE rollup_watermarks SET last_event_id = :hi, updated_at = now() WHERE name = :n"),
+        {"hi": event_id, "n": WATERMARK_NAME},
+    )
+
+
+def run_incremental(db: Session, batch_size: int = 50_000, settle_seconds: float = 5.0) -> int:
+    """
+    Fold new learning_events into the summary tables, one id range per
+    transaction. Deltas and the watermark advance commit together, so a crash
+    or a re-run never double counts. Concurrent runners skip instead of
+    waiting. Returns the number of event ids advanced past.
+    """
+    advanced = 0
+    while True:
+        lo = _lock_watermark(db, skip_locked=True)
+        if lo is None:
+            db.rollback()
+            break
+        hi = db.execute(_NEXT_HI, {"lo": lo, "settle": settle_seconds, "batch": batch_size}).scalar()
+        if hi is None or hi <= lo:
+            db.rollback()
+            break
+        _apply_range(db, lo, hi)
+        _set_watermark(db, hi)
+        db.commit()
+        advanced += hi - lo
+    return advanced
+
+
+def _partitions(hi: int, n: int) -> List[Tuple[int, int]]:
+    """Split ids (0, hi] into at most n contiguous (lo, hi] ranges."""
+    if hi <= 0:
+        return []
+    n = max(1, min(n, hi))
+    step = -(-hi // n)
+    return [(lo, min(lo + step, hi)) for lo in range(0, hi, step)]
+
+
+def _drop_staging(db: Session) -> None:
+    for table in (ITEM_TABLE, SKILL_TABLE):
+        db.execute(text(f"DROP TABLE IF EXISTS {table}{STAGING_SUFFIX}"))
+
+
+def backfill(session_factory: Callable[[], Session], partitions: int = 8) -> int:
+    """
+    Rebuild the summary tables from scratch, aggregating id ranges in parallel
+    sessions into unlogged staging tables. The live tables and the watermark
+    are then replaced together in one transaction, so readers and incremental
+    runs only ever see the old totals or the complete new ones. The watermark
+    row stays locked throughout so incremental runners skip. If the backfill
+    dies midway nothing live has changed; re-run it. Returns the new watermark.
+    """
+    with session_factory() as owner:
+        _lock_watermark(owner, skip_locked=False)
+        hi = owner.execute(text("SELECT coalesce(max(id), 0) FROM learning_events")).scalar_one()
+
+        with session_factory() as db:
+            _drop_staging(db)  # leftovers from an interrupted run
+            for table in (ITEM_TABLE, SKILL_TABLE):
+                db.execute(text(
+                    f"CREATE UNLOGGED TABLE {table}{STAGING_SUFFIX} "
+                    f"(LIKE {table} INCLUDING DEFAULTS INCLUDING INDEXES)"
+                ))
+            db.commit()
+
+        def _run(bounds: Tuple[int, int]) -> None:
+            with session_factory() as db:
+                _apply_range(db, *bounds, staging=True)
+                db.commit()
+
+        try:
+            ranges = _partitions(hi, partitions)
+            with ThreadPoolExecutor(max_workers=max(1, len(ranges))) as pool:
+                list(pool.map(_run, ranges))  # re-raises the first partition failure
+
+            for table in (ITEM_TABLE, SKILL_TABLE):
+                owner.execute(text(f"DELETE FROM {table}"))
+                owner.execute(text(f"INSERT INTO {table} SELECT * FROM {table}{STAGING_SUFFIX}"))
+            _set_watermark(owner, hi)
+            _drop_staging(owner)
+            owner.commit()
+        except BaseException:
+            owner.rollback()
+            with session_factory() as db:
+                _drop_staging(db)
+                db.commit()
+            raise
+    return hi
+
+
+# --- Read side ---
+@dataclass(frozen=True)
+class ItemStats:
+    starts: int
+    completions: int
+    timed_completions: int
+    total_seconds: int
+    est_minutes: Optional[int] = None
+
+    @property
+    def completion_rate(self) -> float:
+        return self.completions / self.starts if self.starts else 0.0
+
+    @property
+    def avg_seconds(self) -> Optional[float]:
+        return self.total_seconds / self.timed_completions if self.timed_completions else None
+
+    @property
+    def time_vs_estimate(self) -> Optional[float]:
+        """Average completion time as a multiple of est_minutes."""
+        avg = self.avg_seconds
+        if avg is None or not self.est_minutes:
+            return None
+        return avg / (self.est_minutes * 60)
+
+
+class StatsCache(TtlSnapshot):
+    """
+    Process-wide snapshot of the summary tables for ranking. The snapshot is
+    reloaded at most once per `ttl_seconds`; other threads keep reading the
+    previous snapshot while one thread reloads.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        super().__init__(ttl_seconds)
+        # (items, skills, popular ids) swapped as one reference
+        self._snapshot: Tuple[Dict[uuid.UUID, ItemStats], Dict[uuid.UUID, ItemStats], List[uuid.UUID]] = ({}, {}, [])
+
+    def refresh(self, db: Session) -> None:
+        items = {
+            r.content_item_id: ItemStats(r.starts, r.completions, r.timed_completions, r.total_seconds, r.est_minutes)
+            for r in db.execute(text("""
+                SELECT s.content_item_id, s.starts, s.completions, s.timed_completions,
+                       s.total_seconds, c.est_minutes
+                FROM content_item_stats s
+                JOIN content_items c ON c.id = s.content_item_id
+                WHERE c.is_active
+            """))
+        }
+        skills = {
+            r.skill_id: ItemStats(r.starts, r.completions, r.timed_completions, r.total_seconds)
+            for r in db.execute(text(
+                "SELECT skill_id, starts, completions, timed_completions, total_seconds FROM skill_stats"
+            ))
+        }
+        popular = sorted(items, key=lambda k: (items[k].completions, items[k].starts), reverse=True)
+        self._snapshot = (items, skills, popular)
+        self._mark_loaded()
+
+    def item(self, db: Session, content_item_id: uuid.UUID) -> Optional[ItemStats]:
+        self._ensure_fresh(db)
+        return self._snapshot[0].get(content_item_id)
+
+    def skill(self, db: Session, skill_id: uuid.UUID) -> Optional[ItemStats]:
+        self._ensure_fresh(db)
+        return self._snapshot[1].get(skill_id)
+
+    def popular(self, db: Session, limit: int) -> List[Tuple[uuid.UUID, ItemStats]]:
+        self._ensure_fresh(db)
+        items, _, popular = self._snapshot
+        return [(k, items[k]) for k in popular[:limit]]
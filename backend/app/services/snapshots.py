@@ -0,0 +1,45 @@
+"""
+Base for process-wide caches that hold one snapshot of some tables and
+reload it at most once per TTL.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+
+class TtlSnapshot:
+    """
+    Subclasses implement `refresh(db)`, which loads and swaps in a new
+    snapshot and then calls `_mark_loaded()`; readers call `_ensure_fresh(db)`
+    first. The first load blocks every caller (there is nothing to serve
+    yet); later reloads are done by one thread while the others keep reading
+    the previous snapshot.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._loaded_at = float("-inf")
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, db: Session) -> None:
+        raise NotImplementedError
+
+    def _mark_loaded(self) -> None:
+        self._loaded_at = time.monotonic()
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def _ensure_fresh(self, db: Session) -> None:
+        if not self._stale():
+            return
+        blocking = self._loaded_at == float("-inf")  # first load: everyone waits
+        if self._refresh_lock.acquire(blocking=blocking):
+            try:
+                if self._stale():
+                    self.refresh(db)
+            finally:
+                self._refresh_lock.release()
@@ -0,0 +1,133 @@
+"""
+Benchmark the per-request user lookups.
+
+    python -m app.tools.bench_queries [--iterations 5000] [--email someone@example.com]
+
+Runs the three hot lookups (get_current_user by id, signup's duplicate check,
+login's credentials fetch) as they were originally written, as a freshly
+built select() per call, and as the prebuilt statements in app.db.queries.
+Each variant runs with psycopg server-side preparation off and at
+DB_PREPARE_THRESHOLD. Per query it reports:
+
+  wall   end-to-end latency, including the database round trip
+  cpu    client process CPU time
+  sa     CPU spent inside SQLAlchemy itself, measured in a separate
+         cProfile pass (so it carries some profiler overhead; compare
+         the numbers with each other, not with cpu)
+
+Needs the app's Postgres DATABASE_URL (postgresql+psycopg://; the
+prepare-threshold runs are psycopg-specific) and at least one user in the
+database (the first one is used unless --email is given).
+"""
+from __future__ import annotations
+
+import argparse
+import cProfile
+import os
+import pstats
+import time
+from typing import Any, Callable, Dict, Optional
+
+import sqlalchemy
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import queries
+from app.models import User
+
+SA_DIR = os.path.dirname(sqlalchemy.__file__)
+
+# name -> ((uid, email) -> (statement, params), how the caller consumes the result)
+Lookup = Dict[str, tuple[Callable[[Any, str], Any], Callable[[Any], Any]]]
+
+BEFORE: Lookup = {
+    "user_by_id": (lambda uid, email: (select(User).where(User.id == uid), None), lambda r: r.scalar_one_or_none()),
+    "signup_check": (lambda uid, email: (select(User).where(User.email == email), None), lambda r: r.scalar_one_or_none()),
+    "login": (lambda uid, email: (select(User).where(User.email == email), None), lambda r: r.scalar_one_or_none()),
+}
+
+AFTER: Lookup = {
+    "user_by_id": (lambda uid, email: (queries.USER_BY_ID, {"user_id": uid}), lambda r: r.scalar_one_or_none()),
+    "signup_check": (lambda uid, email: (queries.USER_ID_BY_EMAIL, {"email": email}), lambda r: r.scalar_one_or_none()),
+    "login": (lambda uid, email: (queries.CREDENTIALS_BY_EMAIL, {"email": email}), lambda r: r.one_or_none()),
+}
+
+
+def _loop(db: Session, make, consume, uid: Any, email: str, n: int) -> None:
+    for _ in range(n):
+        stmt, params = make(uid, email)
+        consume(db.execute(stmt, params))
+        db.expunge_all()  # each request starts with an empty identity map
+
+
+def _sqlalchemy_seconds(profile: cProfile.Profile) -> float:
+    stats = pstats.Stats(profile)
+    return sum(
+        tottime
+        for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items()  # type: ignore[attr-defined]
+        if filename.startswith(SA_DIR)
+    )
+
+
+def bench(db: Session, lookups: Lookup, uid: Any, email: str, n: int) -> Dict[str, tuple[float, float, float]]:
+    out = {}
+    for name, (make, consume) in lookups.items():
+        _loop(db, make, consume, uid, email, 200)  # warm caches and reach the prepare threshold
+
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        _loop(db, make, consume, uid, email, n)
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+
+        profile = cProfile.Profile()
+        profile.enable()
+        _loop(db, make, consume, uid, email, n)
+        profile.disable()
+
+        us = 1e6 / n
+        out[name] = (wall * us, cpu * us, _sqlalchemy_seconds(profile) * us)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--email", default=None, help="user to look up (default: any)")
+    args = parser.parse_args()
+
+    url = str(settings.DATABASE_URL)
+    if make_url(url).get_driver_name() != "psycopg":
+        raise SystemExit("[bench_queries] DATABASE_URL must be postgresql+psycopg://")
+    thresholds: list[Optional[int]] = [None]
+    if settings.prepare_threshold is not None:
+        thresholds.append(settings.prepare_threshold)
+
+    print(f"{'variant':<8} {'prepare':>7} {'query':<13} {'wall us':>9} {'cpu us':>8} {'sa us':>8}")
+    results = {}
+    for threshold in thresholds:
+        engine = create_engine(url, connect_args={"prepare_threshold": threshold})
+        with Session(engine) as db:
+            stmt = select(User.id, User.email).limit(1)
+            if args.email:
+                stmt = stmt.where(User.email == args.email)
+            row = db.execute(stmt).one_or_none()
+            if row is None:
+                raise SystemExit("[bench_queries] no matching user; sign one up first")
+            uid, email = row
+            for variant, lookups in (("before", BEFORE), ("after", AFTER)):
+                for name, (wall, cpu, sa) in bench(db, lookups, uid, email, args.iterations).items():
+                    results[(variant, threshold, name)] = sa
+                    label = "off" if threshold is None else str(threshold)
+                    print(f"{variant:<8} {label:>7} {name:<13} {wall:>9.1f} {cpu:>8.1f} {sa:>8.1f}")
+        engine.dispose()
+
+    threshold = thresholds[-1]
+    before = sum(v for (var, t, _), v in results.items() if var == "before" and t == threshold)
+    after = sum(v for (var, t, _), v in results.items() if var == "after" and t == threshold)
+    print(f"[bench_queries] SQLAlchemy CPU for the three lookups: {before:.1f}us -> {after:.1f}us "
+          f"({(1 - after / before) * 100:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Pick Argon2 parameters for this hardware.
+
+    python -m app.tools.calibrate_argon2 [--target-ms 250] [--concurrency N]
+                                         [--memory-budget-mb 1024]
+
+Hashes are timed with `concurrency` logins in flight at once (argon2 releases
+the GIL, so this is real CPU contention). Memory cost is the largest value
+that keeps concurrency * memory_cost inside the budget; time cost is then the
+largest value whose p95 latency stays under the target. Prints ARGON2_* lines
+for .env. Changing them is safe: users are rehashed on their next login.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from app.core.security import argon2_hasher
+
+MIN_MEMORY_KIB = 19 * 1024  # OWASP floor for argon2id
+MAX_TIME_COST = 10
+
+
+def measure(time_cost: int, memory_kib: int, parallelism: int, concurrency: int, rounds: int) -> Tuple[float, float]:
+    """(p50, p95) latency in ms of one hash with `concurrency` hashes in flight."""
+    hasher = argon2_hasher(time_cost, memory_kib, parallelism)
+
+    def _one(_: int) -> float:
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        return (time.perf_counter() - started) * 1000
+
+    samples: List[float] = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(rounds):
+            samples.extend(pool.map(_one, range(concurrency)))
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="p95 hash latency budget")
+    parser.add_argument("--concurrency", type=int, default=cpus, help="logins hashing at the same time")
+    parser.add_argument("--memory-budget-mb", type=int, default=1024, help="RAM for concurrent hashes")
+    parser.add_argument("--parallelism", type=int, default=1, help="argon2 lanes per hash")
+    parser.add_argument("--rounds", type=int, default=3, help="timing rounds per candidate")
+    args = parser.parse_args()
+
+    memory_kib = (args.memory_budget_mb * 1024) // max(1, args.concurrency)
+    memory_kib = max(MIN_MEMORY_KIB, min(memory_kib, 1024 * 1024))
+    print(f"[calibrate_argon2] {cpus} CPUs, concurrency={args.concurrency}, target p95={args.target_ms:.0f}ms")
+
+    # Shrink memory until the cheapest time cost fits the target
+    while True:
+        p50, p95 = measure(1, memory_kib, args.parallelism, args.concurrency, args.rounds)
+        print(f"  t=1 m={memory_kib // 1024}MiB p={args.parallelism}: p50={p50:.0f}ms p95={p95:.0f}ms")
+        if p95 <= args.target_ms or memory_kib <= MIN_MEMORY_KIB:
+            break
+        memory_kib = max(MIN_MEMORY_KIB, memory_kib // 2)
+
+    best = (1, p50, p95)
+    for time_cost in range(2, MAX_TIME_COST + 1):
+        p50, p95 = measure(time_cost, memory_kib, args.parallelism, args.concurrency, args.rounds)
+        print(f"  t={time_cost} m={memory_kib // 1024}MiB p={args.parallelism}: p50={p50:.0f}ms p95={p95:.0f}ms")
+        if p95 > args.target_ms:
+            break
+        best = (time_cost, p50, p95)
+
+    time_cost, p50, p95 = best
+    if p95 > args.target_ms:
+        print("[calibrate_argon2] warning: even the minimum parameters miss the target; add CPUs or lower concurrency")
+    throughput = args.concurrency / (p50 / 1000)
+    print(f"[calibrate_argon2] chosen: p50={p50:.0f}ms p95={p95:.0f}ms, ~{throughput:.0f} logins/s per worker")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_kib}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Recalibrate IRT item parameters from challenge attempts.
+
+    python -m app.tools.calibrate_irt [--model 1pl|2pl] [--iterations N]
+
+Attempts are streamed into NumPy arrays, fitted by joint MAP estimation and
+written to item_calibrations in bulk. Running API workers pick the new
+parameters up when their item bank refreshes (IRT_ITEM_BANK_TTL_SECONDS).
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.session import SessionLocal, engine
+from app.models import ContentItem, ItemCalibration, LearningEvent
+from app.services.irt import calibrate, prior_difficulty
+
+FETCH_ROWS = 100_000
+WRITE_ROWS = 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", choices=("1pl", "2pl"), default="2pl")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    users: Dict = {}
+    items: Dict = {}
+    item_prior: List[float] = []
+    u_parts, i_parts, y_parts = [], [], []
+
+    stmt = (
+        select(LearningEvent.user_id, LearningEvent.content_item_id, LearningEvent.correct, ContentItem.difficulty)
+        .join(ContentItem, ContentItem.id == LearningEvent.content_item_id)
+        .where(LearningEvent.event_type == "attempt", LearningEvent.correct.is_not(None))
+    )
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=FETCH_ROWS).execute(stmt)
+        for rows in result.partitions():
+            u = np.empty(len(rows), dtype=np.int64)
+            i = np.empty(len(rows), dtype=np.int64)
+            y = np.empty(len(rows), dtype=bool)
+            for k, (user_id, item_id, correct, difficulty) in enumerate(rows):
+                u[k] = users.setdefault(user_id, len(users))
+                idx = items.get(item_id)
+                if idx is None:
+                    idx = items[item_id] = len(items)
+                    item_prior.append(prior_difficulty(difficulty))
+                i[k] = idx
+                y[k] = correct
+            u_parts.append(u)
+            i_parts.append(i)
+            y_parts.append(y)
+
+    if not items:
+        print("[calibrate_irt] no attempts to calibrate from")
+        return
+
+    fit = calibrate(
+        np.concatenate(u_parts),
+        np.concatenate(i_parts),
+        np.concatenate(y_parts),
+        n_users=len(users),
+        n_items=len(items),
+        b_prior=np.asarray(item_prior),
+        model=args.model,
+        iterations=args.iterations,
+    )
+    n = int(sum(len(p) for p in y_parts))
+    print(f"[calibrate_irt] fitted {len(items)} items from {n} responses in {time.perf_counter() - started:.1f}s")
+
+    item_ids = list(items)
+    with SessionLocal() as db:
+        for start in range(0, len(item_ids), WRITE_ROWS):
+            chunk = [
+                {
+                    "content_item_id": item_ids[k],
+                    "discrimination": float(fit.a[k]),
+                    "difficulty": float(fit.b[k]),
+                    "n_responses": int(fit.n_responses[k]),
+                }
+                for k in range(start, min(start + WRITE_ROWS, len(item_ids)))
+            ]
+            stmt = insert(ItemCalibration).values(chunk)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["content_item_id"],
+                set_={
+                    "discrimination": stmt.excluded.discrimination,
+                    "difficulty": stmt.excluded.difficulty,
+                    "n_responses": stmt.excluded.n_responses,
+                    "calibrated_at": func.now(),
+                },
+            ))
+        db.commit()
+    print(f"[calibrate_irt] wrote calibrations in {time.perf_counter() - started:.1f}s total")
+
+
+if __name__ == "__main__":
+    main()
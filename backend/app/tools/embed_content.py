@@ -0,0 +1,47 @@
+"""
+Compute local embeddings for active content items and skills.
+
+    python -m app.tools.embed_content [--refit] [--workers N] [--batch-size N]
+
+Rows are streamed through server-side cursors; only rows whose text (or the
+fitted model) changed since the last run are re-embedded. The pipeline lives
+in app.services.embeddings (the embeddings.refresh job runs the same code).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.embeddings import load_or_fit, run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_PATH, help="fitted model (.npz)")
+    parser.add_argument("--refit", action="store_true", help="refit the model; re-embeds every row")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--n-features", type=int, default=4096, help="hash buckets when fitting")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[embed_content] %(message)s")
+    try:
+        model = load_or_fit(engine, args.model, args.refit, args.batch_size, args.n_features)
+    except ValueError as e:
+        raise SystemExit(f"{e} (rerun with --refit)")
+
+    started = time.perf_counter()
+    scanned, written = run(engine, model, workers=args.workers, batch_size=args.batch_size)
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"[embed_content] scanned {scanned} rows, embedded {written} in {elapsed:.1f}s "
+        f"({scanned / elapsed:.0f} rows/s scanned, {written / elapsed:.0f} rows/s embedded)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Hold many idle push connections open against one API worker.
+
+    python -m app.tools.realtime_loadtest [--url ws://localhost:8000/ws] [--connections 20000]
+                                          [--users 5000] [--ramp 2000] [--duration 300]
+                                          [--publish 0] [--server-pid PID]
+
+Opens `connections` WebSocket (ws://.../ws) or SSE (http://.../sse) streams
+for synthetic users, answers heartbeats like a browser would, and reports
+every 10s: connected/failed/closed counts (with the server's close reasons),
+pings and messages received and, with --server-pid (same host), the worker's
+RSS, open sockets and memory per socket (so copies run in parallel each
+report the whole worker).
+With --publish N it also publishes N messages/s through Postgres
+(NOTIFY -> hub -> socket) and reports end-to-end delivery latency.
+
+Tokens (SSE, Authorization header) and tickets (WebSocket, ?ticket=) are
+signed with the server's JWT_SECRET, so run it with the same env.
+Beyond ~28k connections from one client IP you run out of ephemeral ports:
+run several copies, and raise `ulimit -n` on both sides.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import os
+import random
+import resource
+import statistics
+import struct
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from app.core.security import create_access_token, create_realtime_ticket
+
+REPORT_SECONDS = 10.0
+
+
+@dataclass
+class Stats:
+    connected: int = 0
+    failed: int = 0
+    closed: int = 0
+    pings: int = 0
+    messages: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    close_reasons: Counter = field(default_factory=Counter)
+
+
+def _record(stats: Stats, body: bytes) -> None:
+    if b'"ping"' in body:
+        stats.pings += 1
+        return
+    stats.messages += 1
+    marker = b'"sent":'
+    i = body.find(marker)
+    if i >= 0:
+        end = body.find(b"}", i)
+        stats.latencies_ms.append((time.time() - float(body[i + len(marker):end])) * 1000)
+
+
+async def _handshake(host: str, port: int, request: str):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(request.encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    return reader, writer, head.split(b"\r\n", 1)[0]
+
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    # Client frames must be masked
+    mask = os.urandom(4)
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return struct.pack("!BB", 0x80 | opcode, 0x80 | len(payload)) + mask + masked
+
+
+async def ws_client(host: str, port: int, path: str, ticket: str, stats: Stats) -> None:
+    key = base64.b64encode(os.urandom(16)).decode()
+    request = (
+        f"GET {path}?ticket={ticket} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+        f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    )
+    try:
+        reader, writer, status_line = await _handshake(host, port, request)
+        if b" 101 " not in status_line:
+            raise ConnectionError(status_line)
+    except Exception:
+        stats.failed += 1
+        return
+    stats.connected += 1
+    try:
+        while True:
+            b0, b1 = await reader.readexactly(2)
+            opcode, length = b0 & 0x0F, b1 & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", await reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await reader.readexactly(8))
+            body = await reader.readexactly(length)
+            if opcode == 0x8:  # close: 2-byte code, then the reason
+                stats.close_reasons[body[2:].decode(errors="replace") or "no reason"] += 1
+                break
+            if opcode == 0x9:  # protocol ping from the server
+                writer.write(_ws_frame(0xA, body))
+            elif opcode == 0x1:
+                _record(stats, body)
+                if b'"ping"' in body:
+                    writer.write(_ws_frame(0x1, b"pong"))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        stats.connected -= 1
+        stats.closed += 1
+        writer.close()
+
+
+async def sse_client(host: str, port: int, path: str, token: str, stats: Stats) -> None:
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAuthorization: Bearer {token}\r\n"
+        f"Accept: text/event-stream\r\n\r\n"
+    )
+    try:
+        reader, writer, status_line = await _handshake(host, port, request)
+        if b" 200 " not in status_line:
+            raise ConnectionError(status_line)
+    except Exception:
+        stats.failed += 1
+        return
+    stats.connected += 1
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b"data: "):
+                _record(stats, line[6:])
+    except ConnectionError:
+        pass
+    finally:
+        stats.connected -= 1
+        stats.closed += 1
+        writer.close()
+
+
+async def publisher(user_ids: List[str], rate: float, stop: asyncio.Event) -> None:
+    from app.db.session import SessionLocal
+    from app.services.realtime import publish
+
+    def _publish_batch(n: int) -> None:
+        with SessionLocal() as db:
+            for user_id in random.sample(user_ids, min(n, len(user_ids))):
+                # "sent" last, so the client can parse it without a JSON decoder
+                publish(db, user_id, "loadtest", {"sent": time.time()})
+            db.commit()
+
+    per_tick = max(1, int(rate / 10))
+    while not stop.is_set():
+        await asyncio.to_thread(_publish_batch, per_tick)
+        await asyncio.sleep(per_tick / rate)
+
+
+def _rss_mib(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _sockets(pid: int) -> Optional[int]:
+    try:
+        fd_dir = f"/proc/{pid}/fd"
+        return sum(os.readlink(os.path.join(fd_dir, fd)).startswith("socket:") for fd in os.listdir(fd_dir))
+    except OSError:
+        return None
+
+
+def _report(stats: Stats, started: float, server_pid: Optional[int], base_rss: Optional[float]) -> None:
+    lat = sorted(stats.latencies_ms)
+    stats.latencies_ms.clear()
+    line = (
+        f"[{time.monotonic() - started:6.0f}s] connected={stats.connected} failed={stats.failed} "
+        f"closed={stats.closed} pings={stats.pings} messages={stats.messages}"
+    )
+    if stats.close_reasons:
+        line += " (" + ", ".join(f"{r}: {n}" for r, n in stats.close_reasons.most_common()) + ")"
+    if lat:
+        line += (f" latency p50={statistics.median(lat):.1f}ms"
+                 f" p99={lat[min(len(lat) - 1, int(len(lat) * 0.99))]:.1f}ms")
+    if server_pid:
+        rss, sockets = _rss_mib(server_pid), _sockets(server_pid)
+        if rss is not None:
+            line += f" server_rss={rss:.0f}MiB"
+        if sockets:
+            line += f" server_sockets={sockets}"
+            if rss is not None and base_rss is not None:
+                line += f" (~{(rss - base_rss) * 1024 / sockets:.1f}KiB/socket)"
+    print(line, flush=True)
+
+
+async def run(args: argparse.Namespace) -> None:
+    url = urlparse(args.url)
+    host, port = url.hostname or "localhost", url.port or 8000
+    user_ids = [str(uuid.uuid4()) for _ in range(args.users)]
+    if url.scheme in ("ws", "wss"):
+        client = ws_client
+        # Valid for the whole ramp; the session itself lasts a day
+        ticket_seconds = int(args.connections / args.ramp) + 60
+        session_exp = time.time() + 24 * 3600
+        tokens = {u: create_realtime_ticket(u, ticket_seconds, session_exp) for u in user_ids}
+    else:
+        client = sse_client
+        tokens = {u: create_access_token(u, expires_minutes=24 * 60) for u in user_ids}
+
+    stats = Stats()
+    stop = asyncio.Event()
+    base_rss = _rss_mib(args.server_pid) if args.server_pid else None
+    started = time.monotonic()
+    tasks = []
+    pub: Optional[asyncio.Task] = None
+    next_report = started + REPORT_SECONDS
+
+    for i in range(args.connections):
+        u = user_ids[i % len(user_ids)]
+        tasks.append(asyncio.create_task(client(host, port, url.path, tokens[u], stats)))
+        if (i + 1) % args.ramp == 0:
+            await asyncio.sleep(1.0)
+            if time.monotonic() >= next_report:
+                _report(stats, started, args.server_pid, base_rss)
+                next_report += REPORT_SECONDS
+    print(f"[realtime_loadtest] opened {args.connections} connections in {time.monotonic() - started:.0f}s")
+
+    if args.publish > 0:
+        pub = asyncio.create_task(publisher(user_ids, args.publish, stop))
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        await asyncio.sleep(REPORT_SECONDS)
+        _report(stats, started, args.server_pid, base_rss)
+
+    stop.set()
+    if pub:
+        await pub
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8000/ws", help="ws://host/ws or http://host/sse")
+    parser.add_argument("--connections", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=5_000, help="distinct users the connections belong to")
+    parser.add_argument("--ramp", type=int, default=2_000, help="new connections per second")
+    parser.add_argument("--duration", type=float, default=300.0, help="seconds to hold after ramp-up")
+    parser.add_argument("--publish", type=float, default=0.0, help="messages/s to publish via Postgres")
+    parser.add_argument("--server-pid", type=int, default=None, help="API worker pid to sample RSS from")
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < args.connections + 100:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Re-apply the current scheduler settings to every queued review item.
+
+Run after changing any REVIEW_* setting:
+    python -m app.tools.recompute_reviews [--batch-size N]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.reviews import SchedulerParams, recompute_schedules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    params = SchedulerParams.from_settings(settings)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        n = recompute_schedules(db, params, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"[recompute_reviews] {n} rows in {elapsed:.1f}s ({n / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
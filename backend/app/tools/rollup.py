@@ -0,0 +1,45 @@
+"""
+Maintain content/skill popularity rollups from learning_events.
+
+    python -m app.tools.rollup                      # fold new events once
+    python -m app.tools.rollup --every 30           # keep folding every 30s
+    python -m app.tools.rollup --backfill --partitions 8
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.rollups import backfill, run_incremental
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backfill", action="store_true", help="rebuild summary tables from scratch")
+    parser.add_argument("--partitions", type=int, default=8, help="parallel id ranges for --backfill")
+    parser.add_argument("--every", type=float, default=0, help="repeat incremental runs every N seconds")
+    args = parser.parse_args()
+
+    if args.backfill:
+        started = time.perf_counter()
+        hi = backfill(SessionLocal, partitions=args.partitions)
+        print(f"[rollup] backfilled through event {hi} in {time.perf_counter() - started:.1f}s")
+        return
+
+    while True:
+        with SessionLocal() as db:
+            n = run_incremental(
+                db,
+                batch_size=settings.ROLLUP_BATCH_SIZE,
+                settle_seconds=settings.ROLLUP_SETTLE_SECONDS,
+            )
+        print(f"[rollup] advanced {n} event ids")
+        if not args.every:
+            return
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
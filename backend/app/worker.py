@@ -0,0 +1,184 @@
+"""
+Background job runner.
+
+    python -m app.worker [--concurrency N] [--pool thread|process] [--batch-size N]
+
+Claims runnable jobs from the `jobs` table in batches (FOR UPDATE SKIP LOCKED,
+so any number of workers can run side by side), executes them in a thread or
+process pool, and sleeps on LISTEN jobs between claims instead of polling.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict
+
+import psycopg
+
+from app.core.config import settings
+from app.core.idempotency import purge_expired
+from app.db.session import SessionLocal, engine
+from app.services import job_handlers  # noqa: F401  (registers handlers)
+from app.services.jobs import (
+    NOTIFY_CHANNEL,
+    ClaimedJob,
+    claim,
+    get_handler,
+    heartbeat,
+    mark_done,
+    mark_failed,
+    purge_finished,
+    queue_metrics,
+    requeue_stale,
+)
+
+log = logging.getLogger("app.worker")
+
+MAINTENANCE_SECONDS = 60.0
+
+
+def _run(kind: str, payload: Dict[str, Any]) -> float:
+    """Executed inside the pool; returns run time in seconds."""
+    started = time.perf_counter()
+    get_handler(kind)(payload)
+    return time.perf_counter() - started
+
+
+def _init_pool_process() -> None:
+    """
+    Runs first in each process-pool child. A forked child inherits the
+    parent's pooled connections; forget them without closing (that would end
+    the parent's sessions) so handlers in the child open their own.
+    """
+    engine.dispose(close=False)
+
+
+def _psycopg_dsn() -> str:
+    # Same conversion as app.wait_for_db: SQLAlchemy URL -> libpq DSN
+    return str(settings.DATABASE_URL).replace("postgresql+psycopg://", "postgresql://")
+
+
+class Worker:
+    def __init__(self, concurrency: int, pool: str, batch_size: int, poll_seconds: float):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.executor: Executor = (
+            ProcessPoolExecutor(max_workers=concurrency, initializer=_init_pool_process) if pool == "process"
+            else ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job")
+        )
+        self.inflight: Dict[Future, ClaimedJob] = {}
+        self.stop = threading.Event()
+        self.completed = 0
+        self.failed = 0
+
+    def _finish(self, fut: Future) -> None:
+        claimed = self.inflight.pop(fut)
+        with SessionLocal() as db:
+            try:
+                elapsed = fut.result()
+            except Exception as e:
+                requeued = mark_failed(db, claimed, self.worker_id, "".join(traceback.format_exception(e)))
+                self.failed += 1
+                log.warning("job %s (%s) attempt %s failed%s: %s", claimed.id, claimed.kind,
+                            claimed.attempts, ", will retry" if requeued else "", e)
+                return
+            if not mark_done(db, claimed, self.worker_id):
+                log.warning("job %s (%s) finished after its lock was lost; result dropped", claimed.id, claimed.kind)
+                return
+        self.completed += 1
+        log.info("job %s (%s) done in %.2fs", claimed.id, claimed.kind, elapsed)
+
+    def _claim_and_submit(self) -> bool:
+        """Fill free slots; True if the claim came back full (more may be waiting)."""
+        want = min(self.concurrency - len(self.inflight), self.batch_size)
+        if want <= 0:
+            return False
+        with SessionLocal() as db:
+            jobs = claim(db, self.worker_id, want)
+        for j in jobs:
+            self.inflight[self.executor.submit(_run, j.kind, j.payload)] = j
+        return len(jobs) == want
+
+    def _heartbeat(self) -> None:
+        with SessionLocal() as db:
+            heartbeat(db, self.worker_id, [j.id for j in self.inflight.values()])
+
+    def _maintenance(self) -> None:
+        with SessionLocal() as db:
+            stale = requeue_stale(db, settings.JOB_STALE_SECONDS)
+            purged = purge_finished(db, settings.JOB_RETENTION_SECONDS)
+            expired_keys = purge_expired(db)
+            m = queue_metrics(db, window_seconds=MAINTENANCE_SECONDS)
+        log.info(
+            "queue ready=%s scheduled=%s running=%s failed=%s oldest=%.1fs | worker done=%s failed=%s "
+            "| requeued_stale=%s purged=%s idempotency_expired=%s",
+            m["ready"], m["scheduled"], m["running"], m["failed"], m["oldest_ready_seconds"],
+            self.completed, self.failed, stale, purged, expired_keys,
+        )
+
+    def run(self) -> None:
+        listener = psycopg.connect(_psycopg_dsn(), autocommit=True)
+        listener.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        next_maintenance = next_heartbeat = 0.0
+        log.info("worker %s started (concurrency=%s)", self.worker_id, self.concurrency)
+        try:
+            while not self.stop.is_set():
+                if time.monotonic() >= next_maintenance:
+                    self._maintenance()
+                    next_maintenance = time.monotonic() + MAINTENANCE_SECONDS
+                if self.inflight and time.monotonic() >= next_heartbeat:
+                    self._heartbeat()
+                    next_heartbeat = time.monotonic() + settings.JOB_HEARTBEAT_SECONDS
+
+                backlog = self._claim_and_submit()
+                if backlog and len(self.inflight) < self.concurrency:
+                    continue
+
+                if len(self.inflight) >= self.concurrency:
+                    # Busy: wait for a slot rather than hammering the claim query
+                    done, _ = wait(list(self.inflight), timeout=self.poll_seconds, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        self._finish(fut)
+                    continue
+
+                # Idle (or slots free but nothing runnable): sleep until NOTIFY or poll timeout.
+                # The timeout also covers retries whose run_at passes without a notification.
+                timeout = 0.2 if self.inflight else self.poll_seconds
+                for _ in listener.notifies(timeout=timeout, stop_after=1):
+                    pass
+                for fut in [f for f in self.inflight if f.done()]:
+                    self._finish(fut)
+        finally:
+            for fut in wait(list(self.inflight)).done:
+                self._finish(fut)
+            self.executor.shutdown()
+            listener.close()
+            log.info("worker %s stopped", self.worker_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--pool", choices=("thread", "process"), default=settings.WORKER_POOL)
+    parser.add_argument("--batch-size", type=int, default=settings.WORKER_BATCH_SIZE)
+    parser.add_argument("--poll-seconds", type=float, default=settings.WORKER_POLL_SECONDS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    worker = Worker(args.concurrency, args.pool, args.batch_size, args.poll_seconds)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop.set())
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import gzip
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.deps import get_admin_user
+from app.routers.admin_export import FLUSH_BYTES, _accepts_gzip, _gzip, _uuid_cursor
+
+
+# ------------------------
+# Access
+# ------------------------
+
+def test_admin_user_requires_listed_email(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", "ops@x.io, Lead@X.io")
+
+    admin = SimpleNamespace(email="LEAD@x.io")
+    assert get_admin_user(admin) is admin
+
+    with pytest.raises(HTTPException) as exc:
+        get_admin_user(SimpleNamespace(email="learner@x.io"))
+    assert exc.value.status_code == 403
+
+
+def test_no_admins_configured_forbids_everyone(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", "")
+    with pytest.raises(HTTPException) as exc:
+        get_admin_user(SimpleNamespace(email="ops@x.io"))
+    assert exc.value.status_code == 403
+
+
+# ------------------------
+# Encoding
+# ------------------------
+
+def test_gzip_stream_decompresses_to_the_same_ndjson():
+    lines = [
+        json.dumps({"id": i, "email": f"u{i}@x.io", "note": "é" * (i % 7)}, ensure_ascii=False).encode() + b"\n"
+        for i in range(5000)
+    ]
+    chunks = [b"".join(lines[i:i + 700]) for i in range(0, len(lines), 700)]
+    assert sum(map(len, chunks)) > FLUSH_BYTES
+
+    assert gzip.decompress(b"".join(_gzip(iter(chunks)))) == b"".join(lines)
+    assert gzip.decompress(b"".join(_gzip(iter([])))) == b""
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ("", False),
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, GZIP;q=0.5", True),
+        ("x-gzip", True),
+        ("*", True),
+        ("identity", False),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000", False),
+        ("*;q=0.1, gzip;q=0", False),
+        ("deflate, *;q=0", False),
+    ],
+)
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert _accepts_gzip(header) is expected
+
+
+# ------------------------
+# Cursors
+# ------------------------
+
+def test_uuid_cursor():
+    value = uuid.uuid4()
+    assert _uuid_cursor(None) is None
+    assert _uuid_cursor(str(value)) == value
+
+    with pytest.raises(HTTPException) as exc:
+        _uuid_cursor("42")
+    assert exc.value.status_code == 422
@@ -185,3 +185,26 @@ def test_expired_token_is_rejected():
     expired = jwt.encode(payload, security.JWT_SECRET, algorithm=security.JWT_ALGO)
     rm = _me(expired)
     assert rm.status_code == 401, rm.text
+
+
+# ------------------------
+# Realtime tickets
+# ------------------------
+
+def test_realtime_ticket_opens_ws_but_is_not_an_access_token():
+    token = _signup(_unique_email()).json()["access_token"]
+    r = client.post("/realtime/ticket", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200, r.text
+    ticket = r.json()["ticket"]
+    assert r.json()["expires_in"] > 0
+
+    payload = jwt.decode(ticket, security.JWT_SECRET, algorithms=[security.JWT_ALGO])
+    assert payload["type"] == security.REALTIME_TICKET_TYPE
+    assert payload["exp"] - payload["iat"] <= 60
+    assert payload["session_exp"] == jwt.decode(token, security.JWT_SECRET, algorithms=[security.JWT_ALGO])["exp"]
+
+    assert _me(ticket).status_code == 401
+    assert client.post("/realtime/ticket").status_code == 401
+
+    with client.websocket_connect(f"/ws?ticket={ticket}") as ws:
+        ws.send_text("pong")
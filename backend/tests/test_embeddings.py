@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.services.embeddings import EmbeddingModel, content_hash
+
+CORPUS = [
+    "Binary search on sorted arrays",
+    "Binary search trees: insert and delete",
+    "Dynamic programming: knapsack",
+    "Dynamic programming on grids",
+    "Graph traversal with BFS and DFS",
+    "Shortest paths with Dijkstra",
+]
+
+
+def _fit(dim: int = 4) -> EmbeddingModel:
+    return EmbeddingModel.fit(lambda: [CORPUS[:3], CORPUS[3:]], dim=dim, n_features=256)
+
+
+def test_transform_shape_and_normalization():
+    model = _fit()
+    vecs = model.transform(CORPUS)
+    assert vecs.shape == (len(CORPUS), 4)
+    assert np.allclose(np.linalg.norm(vecs, axis=1), 1.0, atol=1e-5)
+
+
+def test_related_texts_are_closer():
+    vecs = _fit(dim=5).transform(["binary search", "binary search tree", "knapsack dynamic programming"])
+    assert vecs[0] @ vecs[1] > vecs[0] @ vecs[2]
+
+
+def test_save_load_roundtrip_keeps_fingerprint(tmp_path):
+    model = _fit()
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = EmbeddingModel.load(path)
+    assert loaded.fingerprint == model.fingerprint
+    assert content_hash("x", loaded.fingerprint) != content_hash("x", "other-model")
@@ -0,0 +1,246 @@
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+import pytest
+
+from app.models import LearningEvent, User
+from app.services import export
+from app.services.export import (
+    TABLES,
+    _decode_mark,
+    _encode_mark,
+    _PartWriter,
+    arrow_schema,
+    export_table,
+    load_watermarks,
+    rows_to_batch,
+    save_watermarks,
+)
+
+users = TABLES["users"]
+T0 = datetime(2026, 10, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def _user_rows(n: int, start: int = 0):
+    return [(uuid.UUID(int=i), f"u{i}@x.io", "local", T0) for i in range(start, start + n)]
+
+
+# ------------------------
+# Arrow conversion
+# ------------------------
+
+def test_schema_maps_uuid_to_string_and_keeps_timezone():
+    schema = arrow_schema(users)
+    assert schema.names == ["id", "email", "provider", "created_at"]
+    assert schema.field("id").type == pa.string()
+    assert schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    assert "password_hash" not in schema.names
+
+
+def test_rows_to_batch_converts_uuids_and_timestamps():
+    rows = _user_rows(2) + [(uuid.UUID(int=9), "u9@x.io", None, None)]
+    batch = rows_to_batch(rows, arrow_schema(users))
+
+    assert batch.num_rows == 3
+    assert batch.column(0).to_pylist() == [str(uuid.UUID(int=i)) for i in (0, 1, 9)]
+    assert batch.column(2).to_pylist() == ["local", "local", None]
+    created = batch.column(3).to_pylist()
+    assert created[:2] == [T0, T0]
+    assert created[2] is None
+
+
+def test_rows_to_batch_rejects_mismatched_types():
+    with pytest.raises((pa.ArrowInvalid, pa.ArrowTypeError)):
+        rows_to_batch([("not-a-uuid", "e", "local", "yesterday")], arrow_schema(users))
+
+
+# ------------------------
+# Part files
+# ------------------------
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_part_writer_rolls_over_at_rows_per_file(tmp_path, fmt):
+    schema = arrow_schema(users)
+    writer = _PartWriter(str(tmp_path / "users"), "part-run", schema, fmt, rows_per_file=4)
+    for start in range(0, 10, 2):
+        writer.write(rows_to_batch(_user_rows(2, start), schema))
+    files = writer.close()
+
+    ext = "parquet" if fmt == "parquet" else "arrow"
+    assert [os.path.basename(f) for f in files] == [f"part-run-{i:05d}.{ext}" for i in range(3)]
+    assert not [p for p in os.listdir(tmp_path / "users") if p.endswith(".tmp")]
+
+    if fmt == "parquet":
+        counts = [pq.read_metadata(f).num_rows for f in files]
+        emails = [e for f in files for e in pq.read_table(f).column("email").to_pylist()]
+    else:
+        tables = [pa_ipc.open_file(f).read_all() for f in files]
+        counts = [t.num_rows for t in tables]
+        emails = [e for t in tables for e in t.column("email").to_pylist()]
+    assert counts == [4, 4, 2]
+    assert emails == [f"u{i}@x.io" for i in range(10)]
+
+
+def test_part_writer_close_without_rows_writes_nothing(tmp_path):
+    writer = _PartWriter(str(tmp_path / "users"), "part-run", arrow_schema(users), "parquet", 10)
+    assert writer.close() == []
+    assert not (tmp_path / "users").exists()
+
+
+def test_part_writer_abort_keeps_closed_parts_and_drops_partial(tmp_path):
+    schema = arrow_schema(users)
+    directory = tmp_path / "users"
+    writer = _PartWriter(str(directory), "part-run", schema, "parquet", rows_per_file=2)
+    writer.write(rows_to_batch(_user_rows(2), schema))  # fills and closes part 0
+    writer.write(rows_to_batch(_user_rows(1, 2), schema))  # part 1 left open
+    writer.abort()
+
+    assert sorted(os.listdir(directory)) == ["part-run-00000.parquet"]
+    assert pq.read_metadata(str(directory / "part-run-00000.parquet")).num_rows == 2
+    writer.abort()  # nothing open: no-op
+
+
+# ------------------------
+# Watermarks
+# ------------------------
+
+def test_marks_round_trip_through_encode_decode():
+    assert _encode_mark(T0) == T0.isoformat()
+    assert _decode_mark(_encode_mark(T0), User.created_at) == T0
+    # Integer ids pass through both ways
+    assert _encode_mark(12345) == 12345
+    assert _decode_mark(12345, LearningEvent.id) == 12345
+
+
+def test_save_watermarks_round_trip(tmp_path):
+    out_dir = str(tmp_path)
+    assert load_watermarks(out_dir) == {}
+
+    marks = {"users": _encode_mark(T0), "learning_events": 987654321}
+    save_watermarks(out_dir, marks)
+    assert os.listdir(out_dir) == ["_watermarks.json"]
+
+    loaded = load_watermarks(out_dir)
+    assert loaded == marks
+    assert _decode_mark(loaded["users"], TABLES["users"].watermark) == T0
+    assert _decode_mark(loaded["learning_events"], TABLES["learning_events"].watermark) == 987654321
+
+    save_watermarks(out_dir, {**loaded, "learning_events": 987654400})
+    assert load_watermarks(out_dir)["learning_events"] == 987654400
+
+
+# ------------------------
+# Publishing runs
+# ------------------------
+
+events = TABLES["learning_events"]
+skills = TABLES["skills"]
+
+
+def _event_rows(ids):
+    return [(i, str(uuid.UUID(int=1)), str(uuid.UUID(int=2)), "completed", 30, True, T0) for i in ids]
+
+
+def _skill_rows(n):
+    return [(str(uuid.UUID(int=i)), f"s{i}", f"Skill {i}", "cs", None, T0) for i in range(n)]
+
+
+def _serve(monkeypatch, chunks, fail_after=None, first_unsettled=None):
+    """
+    Replace the DB cursor with `chunks`, optionally raising after `fail_after`
+    of them. Returns the list the executed statements are appended to.
+    """
+    statements = []
+
+    def fake_stream(conn, stmt, chunk_rows):
+        statements.append(stmt)
+        for i, chunk in enumerate(chunks):
+            if i == fail_after:
+                raise RuntimeError("connection lost")
+            yield chunk
+    monkeypatch.setattr(export, "_stream", fake_stream)
+    monkeypatch.setattr(export, "_first_unsettled", lambda conn, table, since, settle: first_unsettled)
+    return statements
+
+
+def _published(root):
+    return sorted(
+        os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files
+    )
+
+
+def test_failed_incremental_run_publishes_nothing(tmp_path, monkeypatch):
+    chunks = [_event_rows(range(1, 3)), _event_rows(range(3, 5)), _event_rows(range(5, 7))]
+    _serve(monkeypatch, chunks, fail_after=2)  # after one file has rolled over
+    with pytest.raises(RuntimeError):
+        export_table(None, events, str(tmp_path), rows_per_file=2, run_id="r1")
+    assert _published(tmp_path) == []
+    assert os.listdir(tmp_path / "learning_events") == []
+
+    _serve(monkeypatch, chunks)
+    result = export_table(None, events, str(tmp_path), rows_per_file=2, run_id="r2")
+    assert result.rows == 6 and result.watermark == 6
+    files = _published(tmp_path)
+    assert len(files) == 3 and all("/run=r2/part-" in f for f in files)
+    assert files == sorted(os.path.relpath(f, tmp_path) for f in result.files)
+
+
+def test_incremental_run_without_rows_publishes_nothing(tmp_path, monkeypatch):
+    _serve(monkeypatch, [])
+    result = export_table(None, events, str(tmp_path), since=41, run_id="r1")
+    assert (result.rows, result.files, result.watermark) == (0, [], 41)
+    assert _published(tmp_path) == []
+
+
+def test_snapshot_rerun_replaces_the_days_partition(tmp_path, monkeypatch):
+    _serve(monkeypatch, [_skill_rows(3)])
+    first = export_table(None, skills, str(tmp_path), run_id="r1")
+    _serve(monkeypatch, [_skill_rows(2)])
+    second = export_table(None, skills, str(tmp_path), run_id="r2")
+
+    partition = os.path.dirname(second.files[0])
+    assert os.path.dirname(first.files[0]) == partition
+    assert os.path.basename(partition).startswith("export_date=")
+    assert sorted(os.listdir(tmp_path / "skills")) == [os.path.basename(partition)]
+    assert pq.read_table(partition).num_rows == 2
+
+
+def test_failed_snapshot_run_keeps_the_previous_snapshot(tmp_path, monkeypatch):
+    _serve(monkeypatch, [_skill_rows(3)])
+    first = export_table(None, skills, str(tmp_path), run_id="r1")
+    _serve(monkeypatch, [_skill_rows(1), _skill_rows(1)], fail_after=1)
+    with pytest.raises(RuntimeError):
+        export_table(None, skills, str(tmp_path), run_id="r2")
+    assert [os.path.join(str(tmp_path), f) for f in _published(tmp_path)] == first.files
+
+
+def test_export_all_clears_leftovers_of_killed_runs(tmp_path, monkeypatch):
+    leftover = tmp_path / "skills" / "_staging-r0"
+    leftover.mkdir(parents=True)
+    (leftover / "part-00000.parquet").write_bytes(b"partial")
+    _serve(monkeypatch, [_skill_rows(1)])
+    export.export_all(None, str(tmp_path), ["skills"], run_id="r1")
+    assert not leftover.exists()
+
+
+def _where(stmt):
+    return str(stmt.whereclause.compile(compile_kwargs={"literal_binds": True}))
+
+
+def test_incremental_run_stops_before_first_unsettled_row(tmp_path, monkeypatch):
+    statements = _serve(monkeypatch, [_event_rows(range(11, 15))], first_unsettled=15)
+    export_table(None, events, str(tmp_path), since=10, run_id="r1")
+    where = _where(statements[0])
+    # A prefix of the id order, not "settled rows": id 16 may be settled while 15 isn't
+    assert "learning_events.id > 10" in where and "learning_events.id < 15" in where
+    assert "created_at" not in where
+
+
+def test_incremental_run_is_unbounded_when_everything_has_settled(tmp_path, monkeypatch):
+    statements = _serve(monkeypatch, [], first_unsettled=None)
+    export_table(None, events, str(tmp_path), since=10, run_id="r1")
+    assert _where(statements[0]) == "learning_events.id > 10"
@@ -0,0 +1,136 @@
+import threading
+from typing import Dict, Tuple
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from app.core.idempotency import ClaimResult, IdempotencyMiddleware, StoredResponse
+
+
+class MemoryStore:
+    """In-process stand-in for PostgresIdempotencyStore."""
+
+    def __init__(self):
+        self.rows: Dict[Tuple[str, str], Tuple[str, StoredResponse | None]] = {}
+        self.ttls: Dict[Tuple[str, str], float | None] = {}
+        self.lock = threading.Lock()
+
+    def claim(self, scope, key, request_hash):
+        with self.lock:
+            if (scope, key) not in self.rows:
+                self.rows[(scope, key)] = (request_hash, None)
+                return ClaimResult("owner")
+        return self.fetch(scope, key)
+
+    def fetch(self, scope, key):
+        row = self.rows.get((scope, key))
+        if row is None:
+            return ClaimResult("missing")
+        request_hash, stored = row
+        if stored is None:
+            return ClaimResult("busy", StoredResponse(request_hash, 0, None, b""))
+        return ClaimResult("done", stored)
+
+    def complete(self, scope, key, stored, ttl_seconds=None):
+        self.rows[(scope, key)] = (stored.request_hash, stored)
+        self.ttls[(scope, key)] = ttl_seconds
+
+    def release(self, scope, key):
+        self.rows.pop((scope, key), None)
+
+
+def make_client(store=None, **options):
+    calls = {"n": 0}
+    app = FastAPI()
+    # Same order as app.main: CORS added last, so it wraps the idempotency layer
+    app.add_middleware(IdempotencyMiddleware, store=store or MemoryStore(), wait_seconds=0.2, **options)
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:5176"], allow_methods=["*"])
+
+    @app.post("/things")
+    def create(payload: dict):
+        calls["n"] += 1
+        return {"n": calls["n"], **payload}
+
+    @app.post("/boom")
+    def boom():
+        calls["n"] += 1
+        from fastapi import HTTPException
+        raise HTTPException(status_code=503, detail="unavailable")
+
+    return TestClient(app), calls
+
+
+def test_retry_replays_stored_response():
+    client, calls = make_client()
+    first = client.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+    again = client.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json() == {"n": 1, "a": 1}
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert calls["n"] == 1
+
+
+def test_without_key_every_request_runs():
+    client, calls = make_client()
+    client.post("/things", json={"a": 1})
+    client.post("/things", json={"a": 1})
+    assert calls["n"] == 2
+
+
+def test_key_reuse_with_different_body_is_rejected():
+    client, calls = make_client()
+    client.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+    r = client.post("/things", json={"a": 2}, headers={"Idempotency-Key": "k1"})
+    assert r.status_code == 422
+    assert calls["n"] == 1
+
+
+def test_server_errors_are_not_stored():
+    client, calls = make_client()
+    assert client.post("/boom", headers={"Idempotency-Key": "k2"}).status_code == 503
+    assert client.post("/boom", headers={"Idempotency-Key": "k2"}).status_code == 503
+    assert calls["n"] == 2
+
+
+def test_response_stored_by_another_worker_is_replayed():
+    store = MemoryStore()
+    client_a, calls_a = make_client(store)
+    client_b, calls_b = make_client(store)
+    first = client_a.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k3"})
+    again = client_b.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k3"})
+    assert again.json() == first.json()
+    assert (calls_a["n"], calls_b["n"]) == (1, 0)
+
+
+def test_in_progress_elsewhere_returns_conflict():
+    store = MemoryStore()
+    store.claim("anon", "k4", "other-worker-hash")
+    client, calls = make_client(store)
+    r = client.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k4"})
+    assert r.status_code == 409
+    assert calls["n"] == 0
+
+
+def test_replays_and_rejections_carry_cors_headers():
+    client, _ = make_client()
+    origin = {"Origin": "http://localhost:5176", "Idempotency-Key": "k5"}
+    first = client.post("/things", json={"a": 1}, headers=origin)
+    again = client.post("/things", json={"a": 1}, headers=origin)
+    clash = client.post("/things", json={"a": 2}, headers=origin)
+    assert again.headers["Idempotent-Replayed"] == "true"
+    for r in (first, again, clash):
+        assert r.headers["access-control-allow-origin"] == "http://localhost:5176"
+
+
+def test_skipped_paths_always_run_and_ttl_caps_are_applied():
+    store = MemoryStore()
+    client, calls = make_client(store, skip_paths=("/things",), ttl_caps={"/boom": 60.0})
+    client.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k6"})
+    client.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k6"})
+    assert calls["n"] == 2
+    assert not store.rows
+
+    client2, _ = make_client(store, ttl_caps={"/things": 60.0})
+    client2.post("/things", json={"a": 1}, headers={"Idempotency-Key": "k7"})
+    assert store.ttls[("anon", "k7")] == 60.0
@@ -0,0 +1,79 @@
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.irt import ItemBank, calibrate, select_max_information, update_ability
+
+
+def _simulate(rng, n_users=400, n_items=30, responses_per_user=20):
+    theta = rng.normal(0.0, 1.0, n_users)
+    b = np.linspace(-2.0, 2.0, n_items)
+    a = rng.uniform(0.7, 1.8, n_items)
+    user_idx = np.repeat(np.arange(n_users), responses_per_user)
+    item_idx = rng.integers(0, n_items, user_idx.size)
+    p = 1.0 / (1.0 + np.exp(-a[item_idx] * (theta[user_idx] - b[item_idx])))
+    correct = rng.random(user_idx.size) < p
+    return theta, a, b, user_idx, item_idx, correct
+
+
+def test_calibration_recovers_item_difficulty_order():
+    rng = np.random.default_rng(7)
+    theta, a, b, user_idx, item_idx, correct = _simulate(rng)
+    fit = calibrate(user_idx, item_idx, correct, n_users=theta.size, n_items=b.size)
+    assert np.corrcoef(fit.b, b)[0, 1] > 0.9
+    assert np.corrcoef(fit.theta, theta)[0, 1] > 0.7
+    assert fit.n_responses.sum() == user_idx.size
+
+
+def test_1pl_keeps_discrimination_fixed():
+    rng = np.random.default_rng(3)
+    theta, _, b, user_idx, item_idx, correct = _simulate(rng, n_users=100)
+    fit = calibrate(user_idx, item_idx, correct, n_users=theta.size, n_items=b.size, model="1pl")
+    assert np.allclose(fit.a, 1.0)
+
+
+def test_ability_moves_toward_evidence_and_gains_precision():
+    theta, precision = update_ability(0.0, 1.0, a=1.2, b=0.5, correct=True)
+    assert theta > 0.0 and precision > 1.0
+    lower, _ = update_ability(0.0, 1.0, a=1.2, b=0.5, correct=False)
+    assert lower < 0.0
+
+
+def test_selection_prefers_items_near_ability_and_honours_exclusions():
+    a = np.ones(5)
+    b = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+    assert select_max_information(0.9, a, b) == 3
+    exclude = np.array([False, False, False, True, False])
+    assert select_max_information(0.9, a, b, exclude) in (2, 4)
+    assert select_max_information(0.0, a, b, np.ones(5, dtype=bool)) == -1
+
+
+class BankSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = 0
+
+    def execute(self, stmt, params=None):
+        self.loads += 1
+        return list(self.rows)
+
+
+def test_item_bank_fills_priors_and_reloads_after_ttl():
+    skill, a, b = uuid.UUID(int=1), uuid.UUID(int=2), uuid.UUID(int=3)
+    db = BankSession([
+        SimpleNamespace(skill_id=skill, id=a, difficulty=4, discrimination=None, b=None),
+        SimpleNamespace(skill_id=skill, id=b, difficulty=2, discrimination=1.7, b=-0.4),
+    ])
+    bank = ItemBank(ttl_seconds=300)
+    items = bank.skill(db, skill)
+    assert items.ids == [a, b] and items.position == {a: 0, b: 1}
+    assert items.a.tolist() == [1.0, 1.7]
+    assert items.b.tolist() == [1.0, -0.4]  # uncalibrated: prior from the 1..5 scale
+    assert bank.skill(db, uuid.uuid4()) is None
+    assert db.loads == 1
+
+    bank._loaded_at -= 301
+    db.rows = []
+    assert bank.skill(db, skill) is None
+    assert db.loads == 2
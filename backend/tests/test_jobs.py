@@ -0,0 +1,124 @@
+from concurrent.futures import Future
+
+import pytest
+
+from app import worker as worker_module
+from app.services import jobs
+from app.services.jobs import ClaimedJob, retry_delay_seconds
+
+
+class StubResult:
+    rowcount = 1
+
+
+class StubSession:
+    """Records statements instead of talking to Postgres."""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt, params=None):
+        self.statements.append((str(stmt), params or {}))
+        return StubResult()
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_retry_delay_is_jittered_within_exponential_cap():
+    for attempts in range(1, 8):
+        bound = min(3600.0, 5.0 * 2 ** (attempts - 1))
+        delays = [retry_delay_seconds(attempts) for _ in range(200)]
+        assert all(0 <= d <= bound for d in delays)
+    assert max(retry_delay_seconds(40) for _ in range(200)) <= 3600.0
+
+
+def test_duplicate_handler_registration_is_rejected():
+    @jobs.job("tests.unique-kind")
+    def first(payload):
+        pass
+
+    with pytest.raises(ValueError):
+        @jobs.job("tests.unique-kind")
+        def second(payload):
+            pass
+
+    assert jobs.get_handler("tests.unique-kind") is first
+    with pytest.raises(LookupError):
+        jobs.get_handler("tests.no-such-kind")
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    session = StubSession()
+    monkeypatch.setattr(worker_module, "SessionLocal", lambda: session)
+    w = worker_module.Worker(concurrency=1, pool="thread", batch_size=1, poll_seconds=0.1)
+    yield w, session
+    w.executor.shutdown()
+
+
+class FakeEngine:
+    def __init__(self):
+        self.disposed = []
+
+    def dispose(self, close=True):
+        self.disposed.append(close)
+
+
+def _child_disposals():
+    return worker_module.engine.disposed
+
+
+def test_process_pool_children_drop_inherited_connections(monkeypatch):
+    monkeypatch.setattr(worker_module, "engine", FakeEngine())
+    w = worker_module.Worker(concurrency=1, pool="process", batch_size=1, poll_seconds=0.1)
+    try:
+        # The initializer ran in the child, without closing the parent's sockets
+        assert w.executor.submit(_child_disposals).result(timeout=30) == [False]
+    finally:
+        w.executor.shutdown()
+    assert worker_module.engine.disposed == []
+
+
+def _finished(w, claimed, result=None, error=None):
+    fut = Future()
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+    w.inflight[fut] = claimed
+    w._finish(fut)
+    assert fut not in w.inflight
+
+
+def test_finish_marks_success_done_for_this_worker_only(worker):
+    w, session = worker
+    _finished(w, ClaimedJob(1, "k", {}, attempts=1, max_attempts=3), result=0.1)
+    sql, params = session.statements[-1]
+    assert "status = 'done'" in sql and "locked_by = :worker" in sql
+    assert params == {"id": 1, "worker": w.worker_id}
+    assert w.completed == 1
+
+
+def test_finish_requeues_failure_with_attempts_left(worker):
+    w, session = worker
+    _finished(w, ClaimedJob(2, "k", {}, attempts=1, max_attempts=3), error=RuntimeError("boom"))
+    sql, params = session.statements[-1]
+    assert "status = 'queued'" in sql
+    assert "boom" in params["err"] and params["delay"] >= 0
+    assert w.failed == 1
+
+
+def test_finish_fails_permanently_on_last_attempt(worker):
+    w, session = worker
+    _finished(w, ClaimedJob(3, "k", {}, attempts=3, max_attempts=3), error=RuntimeError("boom"))
+    sql, _ = session.statements[-1]
+    assert "status = 'failed'" in sql
+    assert "status = 'queued'" not in sql
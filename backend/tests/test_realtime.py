@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+
+from app.core.security import create_access_token, create_realtime_ticket
+from app.routers.realtime import _authenticate
+from app.services.realtime import BROADCAST, Hub
+
+
+def _decode(frames):
+    return [json.loads(f) for f in frames]
+
+
+def test_messages_reach_only_that_users_connections():
+    async def run():
+        hub = Hub()
+        a1, a2, b = hub.subscribe("a"), hub.subscribe("a"), hub.subscribe("b")
+        assert hub.deliver("a", "reviews", {"n": 1}) == 2
+        assert _decode(await a1.next_frames()) == [{"type": "reviews", "data": {"n": 1}}]
+        assert _decode(await a2.next_frames()) == [{"type": "reviews", "data": {"n": 1}}]
+        assert not b.pending
+        assert hub.deliver("nobody", "reviews") == 0
+
+    asyncio.run(run())
+
+
+def test_pending_updates_to_a_topic_are_coalesced():
+    async def run():
+        hub = Hub()
+        sub = hub.subscribe("a")
+        hub.deliver("a", "ability", 1)
+        hub.deliver("a", "reviews", "r")
+        hub.deliver("a", "ability", 2)
+        assert _decode(await sub.next_frames()) == [
+            {"type": "ability", "data": 2},
+            {"type": "reviews", "data": "r"},
+        ]
+
+    asyncio.run(run())
+
+
+def test_slow_consumer_is_disconnected_when_queue_is_full():
+    async def run():
+        hub = Hub(max_pending=2)
+        sub = hub.subscribe("a")
+        hub.deliver("a", "t1")
+        hub.deliver("a", "t2")
+        assert hub.deliver("a", "t3") == 0
+        assert sub.closed and sub.close_reason == "slow consumer"
+        assert await sub.next_frames() is None
+        hub.unsubscribe(sub)
+        assert hub.connections == 0
+
+    asyncio.run(run())
+
+
+def test_capacity_limits():
+    async def run():
+        hub = Hub(max_connections=3, max_per_user=2)
+        first = hub.subscribe("a")
+        hub.subscribe("a")
+        hub.subscribe("a")  # evicts the least recently active connection of "a"
+        assert first.closed
+        hub.unsubscribe(first)
+        hub.subscribe("b")
+        assert hub.connections == 3
+        assert hub.subscribe("c") is None
+
+    asyncio.run(run())
+
+
+def test_eviction_skips_connections_already_closed():
+    async def run():
+        hub = Hub(max_per_user=2)
+        first, second = hub.subscribe("a"), hub.subscribe("a")
+        third = hub.subscribe("a")  # evicts first, whose handler hasn't unsubscribed yet
+        assert first.closed and not second.closed
+        second.last_seen = third.last_seen + 1
+
+        hub.subscribe("a")  # must evict third, not pick first again
+        assert third.closed and not second.closed
+        assert sum(not s.closed for s in hub._subs["a"]) == 2
+
+    asyncio.run(run())
+
+
+def test_listeners_see_their_topic_without_local_connections():
+    async def run():
+        hub = Hub()
+        seen = []
+        hub.add_listener("reviews", lambda *args: seen.append(args))
+        hub.add_listener("reviews", lambda *args: 1 / 0)  # a failing listener doesn't stop delivery
+        sub = hub.subscribe("a")
+        hub.dispatch('{"u":"b","t":"reviews","d":{"n":1}}')
+        hub.dispatch('{"u":"a","t":"other"}')
+        assert hub.dispatch('{"u":"a","t":"reviews","d":null}') == 1
+        assert seen == [("b", "reviews", {"n": 1}), ("a", "reviews", None)]
+        assert len(await sub.next_frames()) == 2
+
+    asyncio.run(run())
+
+
+def test_dispatch_parses_notifications_and_broadcasts():
+    async def run():
+        hub = Hub()
+        a, b = hub.subscribe("a"), hub.subscribe("b")
+        assert hub.dispatch(json.dumps({"u": "a", "t": "progress", "d": {"x": 1}})) == 1
+        assert hub.dispatch("not json") == 0
+        assert hub.deliver(BROADCAST, "resync") == 2
+        assert [m["type"] for m in _decode(await a.next_frames())] == ["progress", "resync"]
+        assert [m["type"] for m in _decode(await b.next_frames())] == ["resync"]
+
+    asyncio.run(run())
+
+
+def test_sweep_pings_quiet_connections_and_closes_idle_or_expired():
+    async def run():
+        hub = Hub(heartbeat_seconds=10, idle_seconds=60)
+        quiet, idle = hub.subscribe("a"), hub.subscribe("b")
+        expired = hub.subscribe("c", expires_at=time.time() - 1)
+        quiet.last_sent -= 11
+        idle.last_seen -= 61
+        hub.sweep()
+        assert _decode(await quiet.next_frames()) == [{"type": "ping", "data": None}]
+        assert idle.close_reason == "idle"
+        assert expired.close_reason == "token expired"
+
+    asyncio.run(run())
+
+
+def test_sweep_pings_clients_that_only_receive():
+    async def run():
+        hub = Hub(heartbeat_seconds=10, idle_seconds=60)
+        busy = hub.subscribe("a")
+        busy.last_seen -= 11  # nothing from the client, but frames were just sent
+        hub.sweep()
+        assert _decode(await busy.next_frames()) == [{"type": "ping", "data": None}]
+        busy.touch()  # the pong
+        hub.sweep()
+        assert not busy.pending
+
+    asyncio.run(run())
+
+
+def test_urls_take_tickets_and_headers_take_access_tokens():
+    session_exp = time.time() + 600
+    ticket = create_realtime_ticket("u1", 30, session_exp)
+    access = create_access_token("u1")
+
+    # The connection lives as long as the session, not the 30s ticket
+    assert _authenticate(None, ticket) == ("u1", float(int(session_exp)))
+    assert _authenticate(f"Bearer {access}", None)[0] == "u1"
+    assert _authenticate(None, access) is None  # long-lived token in a URL
+    assert _authenticate(f"Bearer {ticket}", None) is None
+    assert _authenticate(None, create_realtime_ticket("u1", -5)) is None  # expired
+    assert _authenticate(None, None) is None
@@ -0,0 +1,145 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services.reviews import (
+    DueQueueCache,
+    SchedulerParams,
+    initial_state,
+    interval_days,
+    interval_days_batch,
+    schedule_next,
+)
+
+params = SchedulerParams()
+
+
+# ------------------------
+# Scheduler
+# ------------------------
+
+def test_successful_reviews_grow_interval():
+    state = initial_state(params)
+    assert state.interval_days == params.first_interval_days
+
+    state = schedule_next(state, 5, params)
+    assert state.repetitions == 1
+    assert state.interval_days == params.second_interval_days
+
+    prev = state.interval_days
+    state = schedule_next(state, 4, params)
+    assert state.interval_days > prev
+
+
+def test_lapse_resets_repetitions_and_lowers_ease():
+    state = schedule_next(schedule_next(initial_state(params), 5, params), 5, params)
+    lapsed = schedule_next(state, 1, params)
+    assert lapsed.repetitions == 0
+    assert lapsed.lapses == 1
+    assert lapsed.ease < state.ease
+    assert lapsed.interval_days == params.first_interval_days
+
+
+def test_ease_and_interval_are_clamped():
+    state = initial_state(params)
+    for _ in range(20):
+        state = schedule_next(state, 0, params)
+    assert state.ease == params.min_ease
+    assert interval_days(50, 3.0, params) == params.max_interval_days
+
+
+def test_batch_intervals_match_scalar():
+    reps = np.array([0, 1, 2, 3, 7, 40])
+    ease = np.array([2.5, 1.3, 2.1, 2.8, 1.9, 2.5])
+    tuned = SchedulerParams(interval_modifier=0.8, max_interval_days=180.0)
+    batch = interval_days_batch(reps, ease, tuned)
+    expected = [interval_days(int(r), float(e), tuned) for r, e in zip(reps, ease)]
+    assert np.allclose(batch, expected)
+
+
+# ------------------------
+# Due heap cache
+# ------------------------
+
+def test_due_cache_serves_due_items_in_order_and_applies_updates():
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    rows = [(now - timedelta(hours=1), a), (now - timedelta(hours=2), b), (now + timedelta(days=1), c)]
+    loads = []
+
+    def loader(max_rows):
+        loads.append(max_rows)
+        return rows
+
+    cache = DueQueueCache(max_users=2)
+    assert [i for _, i in cache.due(user_id, now, 10, loader)] == [b, a]
+    assert [i for _, i in cache.due(user_id, now, 1, loader)] == [b]
+    assert len(loads) == 1
+
+    cache.record(user_id, b, now + timedelta(days=3))
+    assert [i for _, i in cache.due(user_id, now, 10, loader)] == [a]
+
+
+def test_due_cache_skips_oversized_queues():
+    now = datetime.now(timezone.utc)
+    cache = DueQueueCache(max_items_per_user=2)
+    rows = [(now, uuid.uuid4()) for _ in range(3)]
+    assert cache.due(uuid.uuid4(), now, 10, lambda n: rows[:n]) is None
+
+
+def test_schedule_changes_reach_the_cache_only_after_commit(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.routers import reviews as reviews_router
+
+    now = datetime.now(timezone.utc)
+    user_id, item = uuid.uuid4(), uuid.uuid4()
+    cache = DueQueueCache()
+    monkeypatch.setattr(reviews_router, "_due_cache", cache)
+    cache.due(user_id, now, 10, lambda n: [(now - timedelta(hours=1), item)])
+    engine = create_engine("sqlite://")
+
+    with Session(engine) as db:
+        reviews_router._record_after_commit(db, user_id, item, now + timedelta(days=1))
+        db.rollback()
+    assert [i for _, i in cache.due(user_id, now, 10, None)] == [item]
+
+    with Session(engine) as db:
+        reviews_router._record_after_commit(db, user_id, item, now + timedelta(days=1))
+        assert [i for _, i in cache.due(user_id, now, 10, None)] == [item]  # not yet committed
+        db.commit()
+    assert cache.due(user_id, now, 10, None) == []
+
+
+def test_notifications_from_other_workers_update_the_cache(monkeypatch):
+    from app.routers import reviews as reviews_router
+
+    now = datetime.now(timezone.utc)
+    user_id, a, b = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cache = DueQueueCache()
+    monkeypatch.setattr(reviews_router, "_due_cache", cache)
+    rows = [(now - timedelta(hours=2), a), (now - timedelta(hours=1), b)]
+    loads = []
+
+    def loader(n):
+        loads.append(n)
+        return rows
+
+    cache.due(user_id, now, 10, loader)
+    # Payload as the hub decodes it from the NOTIFY JSON
+    reviews_router.on_realtime(str(user_id), "reviews", {
+        "content_item_id": str(a), "due_at": (now + timedelta(days=2)).isoformat(), "ease": 2.5,
+    })
+    assert [i for _, i in cache.due(user_id, now, 10, loader)] == [b]
+    assert len(loads) == 1
+
+    reviews_router.on_realtime(str(user_id), "reviews", None)  # oversized: data dropped
+    cache.due(user_id, now, 10, loader)
+    assert len(loads) == 2
+
+    reviews_router.on_realtime("*", "resync", None)
+    cache.due(user_id, now, 10, loader)
+    assert len(loads) == 3
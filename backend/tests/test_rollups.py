@@ -0,0 +1,152 @@
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rollups import ItemStats, StatsCache, _partitions
+
+A, B, C = (uuid.UUID(int=i) for i in (1, 2, 3))
+
+
+# ------------------------
+# Backfill partitions
+# ------------------------
+
+@pytest.mark.parametrize("hi, n", [(10, 3), (10, 1), (12, 4), (1000, 7), (5, 5)])
+def test_partitions_cover_ids_exactly_once(hi, n):
+    ranges = _partitions(hi, n)
+    assert len(ranges) <= n
+    assert ranges[0][0] == 0 and ranges[-1][1] == hi
+    assert all(lo < up for lo, up in ranges)
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(ranges, ranges[1:]))
+
+
+def test_partitions_bounds():
+    assert _partitions(10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert _partitions(2, 8) == [(0, 1), (1, 2)]  # hi < n: one id per range
+    assert _partitions(0, 8) == []
+    assert _partitions(7, 0) == [(0, 7)]
+
+
+# ------------------------
+# Derived stats
+# ------------------------
+
+def test_item_stats_rates():
+    s = ItemStats(starts=10, completions=4, timed_completions=2, total_seconds=600, est_minutes=4)
+    assert s.completion_rate == 0.4
+    assert s.avg_seconds == 300
+    assert s.time_vs_estimate == 1.25
+
+
+def test_item_stats_without_data():
+    empty = ItemStats(starts=0, completions=0, timed_completions=0, total_seconds=0, est_minutes=5)
+    assert empty.completion_rate == 0.0
+    assert empty.avg_seconds is None
+    assert empty.time_vs_estimate is None
+
+    untimed = ItemStats(starts=3, completions=3, timed_completions=0, total_seconds=0)
+    assert untimed.completion_rate == 1.0 and untimed.avg_seconds is None
+
+    for est in (None, 0):
+        no_estimate = ItemStats(starts=2, completions=1, timed_completions=1, total_seconds=90, est_minutes=est)
+        assert no_estimate.avg_seconds == 90
+        assert no_estimate.time_vs_estimate is None
+
+
+# ------------------------
+# StatsCache
+# ------------------------
+
+def _item_row(item_id, starts, completions, est=None):
+    return SimpleNamespace(content_item_id=item_id, starts=starts, completions=completions,
+                           timed_completions=completions, total_seconds=60 * completions, est_minutes=est)
+
+
+class StubSession:
+    """Serves the two summary-table queries; optionally blocks inside one."""
+
+    def __init__(self, items, skills=(), gate=None):
+        self.items = items
+        self.skills = skills
+        self.gate = gate
+        self.entered = threading.Event()
+        self.loads = 0
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "content_item_stats" in sql:
+            self.loads += 1
+            self.entered.set()
+            if self.gate is not None:
+                self.gate.wait(5)
+            return list(self.items)
+        assert "skill_stats" in sql
+        return list(self.skills)
+
+
+def test_popular_orders_by_completions_then_starts():
+    db = StubSession([_item_row(A, 9, 2), _item_row(B, 5, 4), _item_row(C, 12, 2)])
+    cache = StatsCache()
+    assert [k for k, _ in cache.popular(db, 10)] == [B, C, A]
+    assert [k for k, _ in cache.popular(db, 2)] == [B, C]
+    assert cache.item(db, A).starts == 9
+    assert cache.item(db, uuid.uuid4()) is None
+
+
+def test_skill_lookup():
+    skill = SimpleNamespace(skill_id=A, starts=4, completions=1, timed_completions=1, total_seconds=30)
+    cache = StatsCache()
+    assert cache.skill(StubSession([], [skill]), A) == ItemStats(4, 1, 1, 30)
+
+
+def test_snapshot_is_reused_until_ttl_expires():
+    cache = StatsCache(ttl_seconds=60)
+    db = StubSession([_item_row(A, 1, 1)])
+    cache.popular(db, 5)
+    cache.item(db, A)
+    assert db.loads == 1
+
+    db.items = [_item_row(A, 1, 1), _item_row(B, 3, 3)]
+    cache._loaded_at -= 61
+    assert [k for k, _ in cache.popular(db, 5)] == [B, A]
+    assert db.loads == 2
+
+
+def test_stale_readers_keep_old_snapshot_while_one_thread_refreshes():
+    cache = StatsCache(ttl_seconds=60)
+    cache.popular(StubSession([_item_row(A, 1, 1)]), 5)
+    cache._loaded_at -= 61
+
+    slow = StubSession([_item_row(B, 2, 2)], gate=threading.Event())
+    refresher = threading.Thread(target=cache.popular, args=(slow, 5))
+    refresher.start()
+    try:
+        assert slow.entered.wait(5)
+        # Another request during the reload: served from the old snapshot, no second load
+        other = StubSession([_item_row(C, 9, 9)])
+        assert [k for k, _ in cache.popular(other, 5)] == [A]
+        assert other.loads == 0
+    finally:
+        slow.gate.set()
+        refresher.join(5)
+    assert [k for k, _ in cache.popular(other, 5)] == [B]
+
+
+def test_first_load_blocks_instead_of_serving_empty():
+    cache = StatsCache()
+    slow = StubSession([_item_row(A, 1, 1)], gate=threading.Event())
+    refresher = threading.Thread(target=cache.popular, args=(slow, 5))
+    refresher.start()
+    assert slow.entered.wait(5)
+
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(cache.popular(StubSession([]), 5)))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()  # waiting for the first snapshot rather than returning []
+    slow.gate.set()
+    refresher.join(5)
+    waiter.join(5)
+    assert [k for k, _ in result[0]] == [A]
@@ -0,0 +1,34 @@
+from passlib.hash import argon2
+
+from app.core import security
+
+
+def test_fresh_hash_is_current():
+    h = security.hash_password("correct horse")
+    assert security.verify_password("correct horse", h)
+    assert not security.password_needs_rehash(h)
+
+
+def test_hash_with_other_parameters_needs_rehash_but_still_verifies():
+    old = argon2.using(rounds=security.ARGON2_TIME_COST + 1).hash("correct horse")
+    assert security.verify_password("correct horse", old)
+    assert security.password_needs_rehash(old)
+
+    cheaper = security.argon2_hasher(1, 8 * 1024, 1).hash("correct horse")
+    assert security.password_needs_rehash(cheaper)
+
+
+def test_malformed_hash_never_needs_rehash():
+    assert not security.password_needs_rehash("not-a-hash")
+
+
+def test_parameters_come_from_settings_and_default_to_passlib():
+    from app.core.config import Settings, settings
+
+    assert (security.ARGON2_TIME_COST, security.ARGON2_MEMORY_COST, security.ARGON2_PARALLELISM) == (
+        settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM,
+    )
+    defaults = Settings.model_fields
+    assert defaults["ARGON2_TIME_COST"].default == argon2.default_rounds
+    assert defaults["ARGON2_MEMORY_COST"].default == argon2.memory_cost
+    assert defaults["ARGON2_PARALLELISM"].default == argon2.parallelism